@@ -0,0 +1,306 @@
+"""Heuristic autoplayer.
+
+For each new piece, :class:`AutoPlayer` scores every placement the engine can
+reach with an evaluation function over board features, optionally looking one
+piece ahead into the preview, and plays the best one. The default evaluation is
+a weighted sum of the features; any ``Callable[[Features], float]`` can be
+plugged in instead.
+
+Features are worked out incrementally: the column heights the board already
+maintains and per-column fill counts are taken once per decision, and each
+candidate placement only updates the columns it covers unless it clears lines.
+"""
+
+from typing import Callable, List, NamedTuple, Optional, Protocol, Sequence, Tuple
+
+from board import FULL_ROW, GRID_HEIGHT, GRID_WIDTH, column_heights
+from engine import (
+    ROTATIONS,
+    Placement,
+    Rotation,
+    TetrisEngine,
+    Tetromino,
+    find_landings,
+    find_placements,
+)
+
+
+class Features(NamedTuple):
+    """Board features after a placement."""
+
+    aggregate_height: int  # Sum of the column heights
+    holes: int  # Empty cells with a filled cell somewhere above them
+    bumpiness: int  # Sum of the height differences between neighbouring columns
+    lines_cleared: int  # Lines cleared by the placement(s)
+    wells: int  # Sum of how far columns sit below both neighbours (walls count as full)
+
+
+class Weights(NamedTuple):
+    """Coefficients of a linear evaluation over Features."""
+
+    aggregate_height: float = -0.510066
+    holes: float = -0.35663
+    bumpiness: float = -0.184483
+    lines_cleared: float = 0.760666
+    wells: float = -0.05
+
+
+Evaluator = Callable[[Features], float]
+
+
+class Player(Protocol):
+    """Anything that can pick a placement for the engine's current piece."""
+
+    def choose(self, engine: TetrisEngine) -> Optional[Placement]: ...
+
+
+def linear_evaluator(weights: Weights = Weights()) -> Evaluator:
+    """Return an evaluation function scoring features as a weighted sum."""
+
+    height_weight, holes_weight, bumpiness_weight, lines_weight, wells_weight = weights
+
+    def evaluate(features: Features) -> float:
+        aggregate_height, holes, bumpiness, lines_cleared, wells = features
+        return (
+            height_weight * aggregate_height
+            + holes_weight * holes
+            + bumpiness_weight * bumpiness
+            + lines_weight * lines_cleared
+            + wells_weight * wells
+        )
+
+    return evaluate
+
+
+def _column_profile(state: Rotation) -> Tuple[Tuple[int, int], ...]:
+    """(top row offset, cell count) for each column of a rotation state."""
+    return tuple(
+        (min(y for x, y in state.cells if x == col), sum(1 for x, _ in state.cells if x == col))
+        for col in range(state.width)
+    )
+
+
+# COLUMN_PROFILES[shape_idx][rotation], in the same layout as ROTATIONS
+COLUMN_PROFILES = tuple(tuple(_column_profile(state) for state in states) for states in ROTATIONS)
+
+# COLUMN_TOPS[shape_idx][rotation]: just the top row offsets of COLUMN_PROFILES
+COLUMN_TOPS = tuple(
+    tuple(tuple(top for top, _ in profile) for profile in profiles) for profiles in COLUMN_PROFILES
+)
+
+
+class BoardProfile:
+    """Per-column heights and fill counts of a board, the base that candidate
+    placements are evaluated against.
+
+    The board's features are summed up front, keeping each column's share of
+    the bumpiness and wells, so a placement only re-scores the columns it
+    covers and their neighbours.
+    """
+
+    def __init__(
+        self,
+        rows: Sequence[int],
+        heights: Optional[Sequence[int]] = None,
+        filled: Optional[Sequence[int]] = None,
+    ) -> None:
+        self.rows = rows
+        self.heights = list(heights) if heights is not None else column_heights(rows)
+        if filled is None:
+            counts = [0] * GRID_WIDTH
+            for row in rows:
+                while row:
+                    bit = row & -row
+                    row ^= bit
+                    counts[bit.bit_length() - 1] += 1
+            filled = counts
+        self.filled = list(filled)
+
+        heights = self.heights
+        # Heights with two columns of wall either side: column col is at col + 2
+        self.padded = [GRID_HEIGHT, GRID_HEIGHT] + heights + [GRID_HEIGHT, GRID_HEIGHT]
+        # bumps[col + 1]: height difference between col and col + 1
+        self.bumps = [0] + [abs(heights[col] - heights[col + 1]) for col in range(GRID_WIDTH - 1)]
+        # well_depths[col + 2]: how far col sits below both neighbours; 0 for walls
+        self.well_depths = (
+            [0, 0] + [_well_depth(heights, col) for col in range(GRID_WIDTH)] + [0, 0]
+        )
+        self.aggregate_height = sum(heights)
+        self.cells = sum(self.filled)
+        self.bumpiness = sum(self.bumps)
+        self.wells = sum(self.well_depths)
+
+    def place(self, state: Rotation, x: int, y: int) -> Tuple[List[int], int]:
+        """Rows after locking a piece and clearing full rows, and the number
+        of rows cleared."""
+        rows = list(self.rows)
+        for i, mask in enumerate(state.masks):
+            rows[y + i] |= mask << x
+        kept = [row for row in rows if row != FULL_ROW]
+        cleared = GRID_HEIGHT - len(kept)
+        if cleared:
+            rows = [0] * cleared + kept
+        return rows, cleared
+
+    def after(self, shape_idx: int, rotation: int, x: int, y: int) -> Tuple["BoardProfile", int]:
+        """The profile of the board after locking the piece at (x, y), and the
+        number of rows it cleared."""
+        rows, cleared = self.place(ROTATIONS[shape_idx][rotation], x, y)
+        if cleared:
+            return BoardProfile(rows), cleared
+        heights = list(self.heights)
+        filled = list(self.filled)
+        for col, (top, count) in enumerate(COLUMN_PROFILES[shape_idx][rotation]):
+            height = GRID_HEIGHT - y - top
+            if heights[x + col] < height:
+                heights[x + col] = height
+            filled[x + col] += count
+        return BoardProfile(rows, heights, filled), 0
+
+    def features(self, shape_idx: int, rotation: int, x: int, y: int) -> Features:
+        """Features of the board after locking the piece at (x, y)."""
+        state = ROTATIONS[shape_idx][rotation]
+        rows = self.rows
+        cleared = 0
+        for i, mask in enumerate(state.masks):
+            if rows[y + i] | mask << x == FULL_ROW:
+                cleared += 1
+        if cleared:
+            # Clears move every column, so start again from the new rows
+            after, _ = self.after(shape_idx, rotation, x, y)
+            return Features(
+                after.aggregate_height,
+                after.aggregate_height - after.cells,
+                after.bumpiness,
+                cleared,
+                after.wells,
+            )
+
+        # Only the covered columns change height, which moves the bumps on
+        # either side of them and the wells one column further out. Heights
+        # are padded with two full columns of wall on each side, so the window
+        # below always has both neighbours of every column it re-scores.
+        width = state.width
+        window = self.padded[x : x + width + 4]  # Columns x - 2 to x + width + 1
+        aggregate = self.aggregate_height
+        for col, top in enumerate(COLUMN_TOPS[shape_idx][rotation], 2):
+            height = GRID_HEIGHT - y - top
+            if window[col] < height:
+                aggregate += height - window[col]
+                window[col] = height
+
+        bumpiness = self.bumpiness
+        bumps = self.bumps
+        # Bumps between columns x - 1 to x + width, leaving out the walls
+        first = 2 if x == 0 else 1
+        last = width + 1 if x + width == GRID_WIDTH else width + 2
+        for i in range(first, last):
+            bumpiness += abs(window[i] - window[i + 1]) - bumps[x + i - 1]
+
+        wells = self.wells
+        well_depths = self.well_depths
+        for i in range(1, width + 3):
+            left = window[i - 1]
+            right = window[i + 1]
+            depth = (left if left < right else right) - window[i]
+            wells += (depth if depth > 0 else 0) - well_depths[x + i]
+
+        holes = aggregate - self.cells - len(state.cells)
+        return Features(aggregate, holes, bumpiness, 0, wells)
+
+
+def _well_depth(heights: Sequence[int], col: int) -> int:
+    """How far a column sits below both its neighbours (walls count as full)."""
+    left = heights[col - 1] if col else GRID_HEIGHT
+    right = heights[col + 1] if col + 1 < GRID_WIDTH else GRID_HEIGHT
+    return max(min(left, right) - heights[col], 0)
+
+
+class AutoPlayer:
+    """Plays the engine's current piece wherever the evaluation scores best.
+
+    With ``lookahead`` set, the ``beam`` best placements are re-scored by the
+    best placement of the next piece that would follow them.
+    """
+
+    def __init__(
+        self, evaluate: Optional[Evaluator] = None, lookahead: bool = True, beam: int = 6
+    ) -> None:
+        self.evaluate = evaluate if evaluate is not None else linear_evaluator()
+        self.lookahead = lookahead
+        self.beam = beam
+
+    def choose(self, engine: TetrisEngine) -> Optional[Placement]:
+        """Return the best placement for the current piece, or None if it has
+        nowhere to go."""
+        piece = engine.current_piece
+        if engine.game_over or not piece:
+            return None
+        placements = find_placements(engine.board, piece)
+        if not placements:
+            return None
+
+        profile = BoardProfile(engine.board.rows, engine.board.heights)
+        evaluate = self.evaluate
+        scored = sorted(
+            (
+                (evaluate(profile.features(piece.shape_idx, p.rotation, p.x, p.y)), i)
+                for i, p in enumerate(placements)
+            ),
+            reverse=True,
+        )
+        if not self.lookahead:
+            return placements[scored[0][1]]
+
+        next_type = engine.next_piece.shape_type
+        best: Optional[Placement] = None
+        best_score = float("-inf")
+        for _, i in scored[: self.beam]:
+            placement = placements[i]
+            after, cleared = profile.after(
+                piece.shape_idx, placement.rotation, placement.x, placement.y
+            )
+            score = self.best_follow_up(after, cleared, Tetromino(next_type))
+            if score > best_score:
+                best, best_score = placement, score
+        return best if best is not None else placements[scored[0][1]]
+
+    def best_follow_up(self, profile: BoardProfile, cleared: int, piece: Tetromino) -> float:
+        """Best score over the placements of piece on the profiled board,
+        counting the lines already cleared to get there.
+
+        Only the landing positions are needed, so they are found without
+        working out the moves to each.
+        """
+        evaluate = self.evaluate
+        best = float("-inf")  # Stays so if the next piece couldn't spawn
+        for x, rotation, y in find_landings(profile.rows, piece):
+            features = profile.features(piece.shape_idx, rotation, x, y)
+            if cleared:
+                features = features._replace(lines_cleared=features.lines_cleared + cleared)
+            score = evaluate(features)
+            if score > best:
+                best = score
+        return best
+
+    def play_piece(self, engine: TetrisEngine) -> bool:
+        """Choose a placement for the current piece and play it out.
+
+        Returns False if there was nothing to play.
+        """
+        placement = self.choose(engine)
+        if placement is None:
+            return False
+        for move in placement.moves:
+            engine.step(move)
+        return True
+
+    def play(self, engine: TetrisEngine, max_pieces: Optional[int] = None) -> int:
+        """Play until the game ends or max_pieces have been placed. Returns the
+        number of pieces placed."""
+        placed = 0
+        while not engine.game_over and (max_pieces is None or placed < max_pieces):
+            if not self.play_piece(engine):
+                break
+            placed += 1
+        return placed
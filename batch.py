@@ -0,0 +1,284 @@
+"""Many Tetris games stepped in lockstep with NumPy.
+
+:class:`BatchTetris` follows the rules of :class:`engine.TetrisEngine`
+(movement, rotation, locking, scoring, levels and fall speed) but holds every
+board in one ``(N, GRID_HEIGHT, GRID_WIDTH)`` uint8 array and applies each step
+to all boards at once, for reinforcement learning and other bulk simulation.
+Cells use the same values as ``Board.colors``: 0 for empty, otherwise an index
+into ``engine.COLORS`` plus one.
+
+Piece sequences come from a NumPy generator shared by the batch, so they
+differ from the sequences ``randomizer`` deals for the same seed.
+"""
+
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from board import GRID_HEIGHT, GRID_WIDTH
+from engine import (
+    ACTIONS,
+    BASE_FALL_SPEED,
+    HARD_DROP_SCORE,
+    LINES_PER_LEVEL,
+    MIN_FALL_SPEED,
+    PIECE_TYPES,
+    ROTATIONS,
+    SOFT_DROP_SCORE,
+    SPEED_DECREASE,
+    TICK_RATE,
+)
+
+IntArray = npt.NDArray[np.int64]
+BoolArray = npt.NDArray[np.bool_]
+
+# Action codes for step(), indices into engine.ACTIONS
+LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP, GRAVITY = range(len(ACTIONS))
+
+# Cell offsets of every rotation state: CELL_DX[shape_idx, rotation] holds the
+# x offsets of its four cells from the piece position, CELL_DY the y offsets
+CELL_DX = np.array([[[x for x, _ in state.cells] for state in states] for states in ROTATIONS])
+CELL_DY = np.array([[[y for _, y in state.cells] for state in states] for states in ROTATIONS])
+SPAWN_X = np.array([GRID_WIDTH // 2 - states[0].width // 2 for states in ROTATIONS])
+
+RANDOMIZERS = ("uniform", "bag")
+
+
+class BatchTetris:
+    """N independent games of Tetris stored as NumPy arrays.
+
+    ``step`` takes one action code per board (an index into
+    ``engine.ACTIONS``, see the module constants) and ``tick`` advances every
+    board by one fixed timestep. Boards whose game is over ignore actions
+    until they are ``reset``.
+
+    ``grid`` supplies the board array to play on instead of allocating one, for
+    example a view over shared memory; it is cleared when the games start.
+    """
+
+    def __init__(
+        self,
+        num_boards: int,
+        seed: Union[None, int, np.random.SeedSequence] = None,
+        randomizer: str = "uniform",
+        grid: Optional[npt.NDArray[np.uint8]] = None,
+    ) -> None:
+        if randomizer not in RANDOMIZERS:
+            raise ValueError(f"Unknown randomizer: {randomizer!r}")
+        self.num_boards = num_boards
+        self.randomizer = randomizer
+        self.rng = np.random.default_rng(seed)
+
+        n = num_boards
+        if grid is None:
+            grid = np.zeros((n, GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        elif grid.shape != (n, GRID_HEIGHT, GRID_WIDTH) or grid.dtype != np.uint8:
+            raise ValueError(f"grid must be a ({n}, {GRID_HEIGHT}, {GRID_WIDTH}) uint8 array")
+        self.grid = grid
+        self.piece = np.zeros(n, dtype=np.int64)
+        self.rotation = np.zeros(n, dtype=np.int64)
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.next_piece = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.lines_cleared = np.zeros(n, dtype=np.int64)
+        self.pieces_used = np.zeros(n, dtype=np.int64)
+        self.gravity_ticks = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=np.bool_)
+        # Shuffled bags for the "bag" randomizer, and how much of each is dealt
+        self.bags = np.zeros((n, len(PIECE_TYPES)), dtype=np.int64)
+        self.bag_pos = np.full(n, len(PIECE_TYPES), dtype=np.int64)
+
+        self.reset()
+
+    @property
+    def fall_speed(self) -> npt.NDArray[np.float64]:
+        """Seconds per gravity step on each board."""
+        return np.maximum(MIN_FALL_SPEED, BASE_FALL_SPEED - SPEED_DECREASE * (self.level - 1))
+
+    @property
+    def gravity_interval(self) -> IntArray:
+        """Ticks between gravity steps on each board, as in TetrisEngine."""
+        interval: IntArray = np.maximum(1, np.round(self.fall_speed * TICK_RATE)).astype(np.int64)
+        return interval
+
+    def reset(self, boards: Union[None, BoolArray, Sequence[int]] = None) -> None:
+        """Start new games on the given boards (a mask or indices), or on all."""
+        if boards is None:
+            idx = np.arange(self.num_boards)
+        else:
+            selected = np.asarray(boards)
+            if selected.dtype == np.bool_:
+                idx = np.flatnonzero(selected)
+            else:
+                idx = selected.astype(np.int64)
+        self.grid[idx] = 0
+        for array in (self.score, self.lines_cleared, self.pieces_used, self.gravity_ticks):
+            array[idx] = 0
+        self.level[idx] = 1
+        self.game_over[idx] = False
+        self.bag_pos[idx] = len(PIECE_TYPES)
+        self.next_piece[idx] = self.draw_pieces(idx)
+        self.spawn(idx)
+
+    def draw_pieces(self, idx: IntArray) -> IntArray:
+        """Deal the next piece for each of the given boards."""
+        if self.randomizer == "uniform":
+            return self.rng.integers(len(PIECE_TYPES), size=len(idx))
+
+        refill = idx[self.bag_pos[idx] >= len(PIECE_TYPES)]
+        if len(refill):
+            self.bags[refill] = np.argsort(self.rng.random((len(refill), len(PIECE_TYPES))))
+            self.bag_pos[refill] = 0
+        pieces: IntArray = self.bags[idx, self.bag_pos[idx]]
+        self.bag_pos[idx] += 1
+        return pieces
+
+    def spawn(self, idx: IntArray) -> None:
+        """Bring in the next piece on the given boards, ending blocked games."""
+        self.piece[idx] = self.next_piece[idx]
+        self.next_piece[idx] = self.draw_pieces(idx)
+        self.rotation[idx] = 0
+        self.x[idx] = SPAWN_X[self.piece[idx]]
+        self.y[idx] = 0
+        self.game_over[idx] |= self.collides(
+            idx, self.piece[idx], self.rotation[idx], self.x[idx], self.y[idx]
+        )
+
+    def cell_positions(
+        self, shape: IntArray, rotation: IntArray, x: IntArray, y: IntArray
+    ) -> Tuple[IntArray, IntArray]:
+        """Return the (rows, cols) of each piece's four cells, shaped (k, 4)."""
+        return y[:, None] + CELL_DY[shape, rotation], x[:, None] + CELL_DX[shape, rotation]
+
+    def collides(
+        self, idx: IntArray, shape: IntArray, rotation: IntArray, x: IntArray, y: IntArray
+    ) -> BoolArray:
+        """Check pieces on the given boards against walls, floor and filled
+        cells. Rows above the top are empty."""
+        rows, cols = self.cell_positions(shape, rotation, x, y)
+        outside = (cols < 0) | (cols >= GRID_WIDTH) | (rows >= GRID_HEIGHT)
+        filled = self.grid[
+            idx[:, None], np.clip(rows, 0, GRID_HEIGHT - 1), np.clip(cols, 0, GRID_WIDTH - 1)
+        ]
+        hits: BoolArray = (outside | ((filled != 0) & (rows >= 0))).any(axis=1)
+        return hits
+
+    def drop_rows(self, idx: IntArray) -> IntArray:
+        """Return the row each current piece on the given boards lands on."""
+        # Row of the nearest filled cell (or the floor) at or below every cell
+        grid = self.grid[idx] != 0
+        rows = np.arange(GRID_HEIGHT)[None, :, None]
+        surface = np.where(grid, rows, GRID_HEIGHT)
+        surface = np.minimum.accumulate(surface[:, ::-1], axis=1)[:, ::-1]
+
+        piece_rows, cols = self.cell_positions(
+            self.piece[idx], self.rotation[idx], self.x[idx], self.y[idx]
+        )
+        below = surface[np.arange(len(idx))[:, None], np.maximum(piece_rows, 0), cols]
+        distance = (below - piece_rows - 1).min(axis=1)
+        landing: IntArray = self.y[idx] + distance
+        return landing
+
+    def step(self, actions: Union[IntArray, Sequence[int]]) -> BoolArray:
+        """Apply one action code to the current piece on every board.
+
+        Returns a mask of the boards whose state changed.
+        """
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_boards,):
+            raise ValueError(f"Expected {self.num_boards} actions, got shape {actions.shape}")
+        if ((actions < 0) | (actions >= len(ACTIONS))).any():
+            raise ValueError("Unknown action code")
+        changed = np.zeros(self.num_boards, dtype=np.bool_)
+        live = ~self.game_over
+
+        for code, dx, turn in ((LEFT, -1, 0), (RIGHT, 1, 0), (ROTATE, 0, 1)):
+            idx = np.flatnonzero(live & (actions == code))
+            changed[self.move(idx, dx, 0, turn)] = True
+
+        idx = np.flatnonzero(live & (actions == SOFT_DROP))
+        moved = self.move(idx, 0, 1, 0)
+        self.score[moved] += SOFT_DROP_SCORE
+        changed[moved] = True
+
+        idx = np.flatnonzero(live & (actions == HARD_DROP))
+        self.hard_drop(idx)
+        changed[idx] = True
+
+        idx = np.flatnonzero(live & (actions == GRAVITY))
+        self.fall(idx)
+        changed[idx] = True
+        return changed
+
+    def tick(self) -> BoolArray:
+        """Advance every board by one fixed timestep, applying gravity where due.
+
+        Returns a mask of the boards whose state changed.
+        """
+        live = ~self.game_over
+        self.gravity_ticks[live] += 1
+        due = live & (self.gravity_ticks >= self.gravity_interval)
+        self.gravity_ticks[due] = 0
+        self.fall(np.flatnonzero(due))
+        return due
+
+    def move(self, idx: IntArray, dx: int, dy: int, turn: int) -> IntArray:
+        """Shift and turn the pieces on the given boards wherever the new
+        position is free. Returns the boards whose piece moved."""
+        rotation = (self.rotation[idx] + turn) % 4
+        free = ~self.collides(idx, self.piece[idx], rotation, self.x[idx] + dx, self.y[idx] + dy)
+        moved = idx[free]
+        self.x[moved] += dx
+        self.y[moved] += dy
+        self.rotation[moved] = rotation[free]
+        return moved
+
+    def fall(self, idx: IntArray) -> None:
+        """Move the pieces on the given boards down a row, locking those that
+        can't fall any further."""
+        moved = self.move(idx, 0, 1, 0)
+        self.lock(np.setdiff1d(idx, moved, assume_unique=True))
+
+    def hard_drop(self, idx: IntArray) -> None:
+        """Drop the pieces on the given boards straight down and lock them."""
+        if not len(idx):
+            return
+        landing = self.drop_rows(idx)
+        self.score[idx] += (landing - self.y[idx]) * HARD_DROP_SCORE
+        self.y[idx] = landing
+        self.lock(idx)
+
+    def lock(self, idx: IntArray) -> None:
+        """Write the current pieces into the given boards, clear full rows,
+        score them and spawn the next pieces."""
+        if not len(idx):
+            return
+        rows, cols = self.cell_positions(
+            self.piece[idx], self.rotation[idx], self.x[idx], self.y[idx]
+        )
+        self.grid[idx[:, None], rows, cols] = (self.piece[idx] + 1)[:, None].astype(np.uint8)
+        self.gravity_ticks[idx] = 0
+        self.pieces_used[idx] += 1
+
+        full = (self.grid[idx] != 0).all(axis=2)
+        counts = full.sum(axis=1)
+        clearing = counts > 0
+        if clearing.any():
+            cleared = idx[clearing]
+            full = full[clearing]
+            count = counts[clearing]
+            # A stable sort on "row is kept" moves full rows to the top and keeps
+            # the others in order; the full rows are then emptied.
+            order = np.argsort(~full, axis=1, kind="stable")
+            grid = np.take_along_axis(self.grid[cleared], order[:, :, None], axis=1)
+            grid[np.arange(GRID_HEIGHT)[None, :] < count[:, None]] = 0
+            self.grid[cleared] = grid
+
+            self.score[cleared] += 100 * count * count
+            self.lines_cleared[cleared] += count
+            self.level[cleared] = self.lines_cleared[cleared] // LINES_PER_LEVEL + 1
+
+        self.spawn(idx)
@@ -0,0 +1,219 @@
+"""Bitboard storage for the Tetris playfield.
+
+Each row is a ``GRID_WIDTH``-bit integer with bit ``x`` set when column ``x`` is
+filled, so collision tests are a shift and an AND per piece row and a full row
+is simply ``row == FULL_ROW``. Colors are kept in a parallel plane of bytes
+(0 for empty, otherwise an index into ``engine.COLORS`` plus one) that is only
+read for rendering and color-based puzzle goals. A per-column height map is
+kept up to date alongside, so drop distances don't need row-by-row scans.
+
+Boards also keep a 64-bit Zobrist hash of their filled cells, the XOR of a
+random key per filled cell, for search code to key transposition tables on.
+It is updated as pieces are written and rows cleared rather than recomputed.
+"""
+
+import random
+from typing import List, Sequence, Tuple
+
+GRID_WIDTH = 10
+GRID_HEIGHT = 20
+
+FULL_ROW = (1 << GRID_WIDTH) - 1
+
+
+def _zobrist_rows(seed: int) -> Tuple[Tuple[int, ...], ...]:
+    """Key tables for every row: [y][row] is the XOR of the cell keys of the
+    cells set in row bitmask ``row`` on row y."""
+    rng = random.Random(seed)
+    table = []
+    for _ in range(GRID_HEIGHT):
+        cell_keys = [rng.getrandbits(64) for _ in range(GRID_WIDTH)]
+        keys = [0] * (FULL_ROW + 1)
+        for row in range(1, FULL_ROW + 1):
+            bit = row & -row
+            keys[row] = keys[row ^ bit] ^ cell_keys[bit.bit_length() - 1]
+        table.append(tuple(keys))
+    return tuple(table)
+
+
+# ZOBRIST_ROWS[y][row], built once at import from a fixed seed so hashes are
+# the same in every process
+ZOBRIST_ROWS = _zobrist_rows(0x7E7215)
+
+
+def zobrist_hash(rows: Sequence[int]) -> int:
+    """Zobrist hash of a board's rows, as kept by :attr:`Board.zobrist`."""
+    key = 0
+    for y, row in enumerate(rows):
+        key ^= ZOBRIST_ROWS[y][row]
+    return key
+
+
+def shape_masks(shape: Sequence[Sequence[int]]) -> List[int]:
+    """Convert a 0/1 shape matrix into one bitmask per row."""
+    return [sum(1 << x for x, cell in enumerate(row) if cell) for row in shape]
+
+
+def column_heights(rows: Sequence[int]) -> List[int]:
+    """Height of each column's highest filled cell above the floor; 0 if empty."""
+    heights = [0] * GRID_WIDTH
+    seen = 0
+    for y, row in enumerate(rows):
+        new = row & ~seen
+        while new:
+            bit = new & -new
+            new ^= bit
+            heights[bit.bit_length() - 1] = GRID_HEIGHT - y
+        seen |= row
+        if seen == FULL_ROW:
+            break
+    return heights
+
+
+class Board:
+    def __init__(self) -> None:
+        self.rows: List[int] = [0] * GRID_HEIGHT
+        # Only ever modified in place: env.TetrisEnv hands out views over it
+        self.colors = bytearray(GRID_WIDTH * GRID_HEIGHT)
+        # Height of each column's highest filled cell above the floor; 0 if empty
+        self.heights: List[int] = [0] * GRID_WIDTH
+        # Bumped on every change, so callers can cache values derived from the board
+        self.version = 0
+        # Zobrist hash of the filled cells; equal boards always hash the same
+        self.zobrist = 0
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[int]) -> "Board":
+        """Build a board from row bitmasks alone, for search. Colors stay empty."""
+        board = cls()
+        board.rows[:] = rows
+        board.heights = column_heights(rows)
+        board.zobrist = zobrist_hash(board.rows)
+        return board
+
+    def copy(self) -> "Board":
+        """Return an independent copy of the board."""
+        board = Board()
+        board.rows[:] = self.rows
+        board.colors[:] = self.colors
+        board.heights[:] = self.heights
+        board.version = self.version
+        board.zobrist = self.zobrist
+        return board
+
+    def color_index(self, x: int, y: int) -> int:
+        """Return the color plane value at (x, y); 0 means empty."""
+        return self.colors[y * GRID_WIDTH + x]
+
+    def set_cell(self, x: int, y: int, color_index: int) -> None:
+        """Fill a single cell with the given color plane value."""
+        row = self.rows[y]
+        self.zobrist ^= ZOBRIST_ROWS[y][row] ^ ZOBRIST_ROWS[y][row | 1 << x]
+        self.rows[y] = row | 1 << x
+        self.colors[y * GRID_WIDTH + x] = color_index
+        self.heights[x] = max(self.heights[x], GRID_HEIGHT - y)
+        self.version += 1
+
+    def collides(self, masks: Sequence[int], x: int, y: int) -> bool:
+        """Check if piece row masks placed with their top-left at (x, y) overlap
+        a wall, the floor or a filled cell. Rows above the top are empty."""
+        rows = self.rows
+        for i, mask in enumerate(masks):
+            if x >= 0:
+                shifted = mask << x
+            else:
+                if mask & ((1 << -x) - 1):
+                    return True
+                shifted = mask >> -x
+            if shifted & ~FULL_ROW:
+                return True
+            row_y = y + i
+            if row_y >= GRID_HEIGHT:
+                return True
+            if row_y >= 0 and rows[row_y] & shifted:
+                return True
+        return False
+
+    def place(self, masks: Sequence[int], x: int, y: int, color_index: int) -> None:
+        """Write piece row masks into the board. The piece must fit on the board."""
+        self.version += 1
+        heights = self.heights
+        rows = self.rows
+        for i, mask in enumerate(masks):
+            row_y = y + i
+            row = rows[row_y]
+            keys = ZOBRIST_ROWS[row_y]
+            self.zobrist ^= keys[row] ^ keys[row | mask << x]
+            rows[row_y] = row | mask << x
+            offset = row_y * GRID_WIDTH + x
+            height = GRID_HEIGHT - row_y
+            col = x
+            while mask:
+                if mask & 1:
+                    self.colors[offset + col - x] = color_index
+                    if heights[col] < height:
+                        heights[col] = height
+                mask >>= 1
+                col += 1
+
+    def drop_row(self, masks: Sequence[int], bottoms: Sequence[int], x: int, y: int) -> int:
+        """Return the row a piece at (x, y) lands on if dropped straight down.
+
+        ``bottoms`` gives, for each column of the piece, the row offset of its
+        lowest cell. The piece must not collide at (x, y).
+        """
+        heights = self.heights
+        distance = GRID_HEIGHT
+        for col, bottom in enumerate(bottoms):
+            cell_y = y + bottom
+            surface = GRID_HEIGHT - heights[x + col]  # Highest filled row, or the floor
+            if cell_y >= surface:
+                # Tucked under an overhang: the height map can't see the
+                # floor below, so fall back to walking down row by row.
+                while not self.collides(masks, x, y + 1):
+                    y += 1
+                return y
+            if surface - cell_y - 1 < distance:
+                distance = surface - cell_y - 1
+        return y + distance
+
+    def clear_full_rows(self, top: int = 0, bottom: int = GRID_HEIGHT) -> List[int]:
+        """Remove full rows between top (inclusive) and bottom (exclusive),
+        shifting everything above them down.
+
+        Only rows in that range are tested, so callers pass the rows a locked
+        piece touched. Returns the indices of the removed rows, top to bottom.
+        """
+        rows = self.rows
+        full = [y for y in range(max(top, 0), min(bottom, GRID_HEIGHT)) if rows[y] == FULL_ROW]
+        if not full:
+            return full
+
+        # Rows below the lowest full row stay put; everything above it is
+        # compacted in one pass, with empty rows filling in at the top.
+        self.version += 1
+        count = len(full)
+        last = full[-1] + 1
+        kept = [y for y in range(last) if y not in full]
+        shifted = [0] * count + [rows[y] for y in kept]
+        # Every row above the lowest cleared one may have moved
+        zobrist = self.zobrist
+        for y in range(last):
+            zobrist ^= ZOBRIST_ROWS[y][rows[y]] ^ ZOBRIST_ROWS[y][shifted[y]]
+        self.zobrist = zobrist
+        rows[:last] = shifted
+        colors = self.colors
+        colors[: last * GRID_WIDTH] = bytes(count * GRID_WIDTH) + b"".join(
+            colors[y * GRID_WIDTH : (y + 1) * GRID_WIDTH] for y in kept
+        )
+
+        # Every column loses one cell per cleared row. If a column's top cell
+        # was itself cleared, walk down to the next filled cell.
+        heights = self.heights
+        for col in range(GRID_WIDTH):
+            height = heights[col] - count
+            bit = 1 << col
+            while height and not rows[GRID_HEIGHT - height] & bit:
+                height -= 1
+            heights[col] = height
+        return full
@@ -0,0 +1,717 @@
+"""Headless Tetris rules engine.
+
+Everything needed to simulate a game lives here, with no pygame dependency, so
+games can be stepped on machines without a display. ``TetrisGame`` in
+``tetris.py`` renders on top of :class:`TetrisEngine`.
+"""
+
+import random
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from board import FULL_ROW, GRID_HEIGHT, GRID_WIDTH, Board, shape_masks
+from puzzle import Puzzle
+from randomizer import PieceGenerator
+
+# Scoring constants
+SOFT_DROP_SCORE = 1  # Points per cell for soft drop
+HARD_DROP_SCORE = 2  # Points per cell for hard drop
+
+# Level constants
+LINES_PER_LEVEL = 10  # Number of lines needed to advance to next level
+BASE_FALL_SPEED = 2.0  # Starting fall speed in seconds (slower start)
+SPEED_DECREASE = 0.2  # How much to decrease fall speed per level (more gradual)
+MIN_FALL_SPEED = 0.15  # Minimum fall speed (maximum difficulty, slightly more forgiving)
+
+# Timing constants
+TICK_RATE = 60  # Fixed engine timesteps per second, independent of frame rate
+
+# Colors
+CYAN = (0, 240, 240)  # Slightly softer colors
+BLUE = (0, 0, 240)
+ORANGE = (240, 160, 0)
+YELLOW = (240, 240, 0)
+GREEN = (0, 240, 0)
+PURPLE = (160, 0, 240)
+RED = (240, 0, 0)
+
+# Tetromino shapes
+SHAPES = [
+    [[1, 1, 1, 1]],  # I
+    [[1, 0, 0], [1, 1, 1]],  # J
+    [[0, 0, 1], [1, 1, 1]],  # L
+    [[1, 1], [1, 1]],  # O
+    [[0, 1, 1], [1, 1, 0]],  # S
+    [[0, 1, 0], [1, 1, 1]],  # T
+    [[1, 1, 0], [0, 1, 1]],  # Z
+]
+
+COLORS = [CYAN, BLUE, ORANGE, YELLOW, GREEN, PURPLE, RED]
+
+# Piece names, in the same order as SHAPES and COLORS
+PIECE_TYPES = ("I", "J", "L", "O", "S", "T", "Z")
+PIECE_INDEX = {shape_type: idx for idx, shape_type in enumerate(PIECE_TYPES)}
+
+
+class Rotation(NamedTuple):
+    """One rotation state of a tetromino.
+
+    Shapes are stored trimmed to their bounding box, so ``width`` and ``height``
+    are the bounding box size and ``cells`` are (x, y) offsets from its top-left.
+    ``bottoms`` holds the row offset of the lowest cell in each column.
+    """
+
+    shape: Tuple[Tuple[int, ...], ...]
+    masks: Tuple[int, ...]
+    cells: Tuple[Tuple[int, int], ...]
+    width: int
+    height: int
+    bottoms: Tuple[int, ...]
+
+
+def _build_rotations() -> Tuple[Tuple[Rotation, ...], ...]:
+    """Precompute the four clockwise rotation states of every shape in SHAPES."""
+    table = []
+    for base in SHAPES:
+        states = []
+        shape = tuple(tuple(row) for row in base)
+        for _ in range(4):
+            cells = tuple(
+                (x, y) for y, row in enumerate(shape) for x, cell in enumerate(row) if cell
+            )
+            width = len(shape[0])
+            bottoms = tuple(max(y for x, y in cells if x == col) for col in range(width))
+            states.append(
+                Rotation(shape, tuple(shape_masks(shape)), cells, width, len(shape), bottoms)
+            )
+            shape = tuple(zip(*shape[::-1]))
+        table.append(tuple(states))
+    return tuple(table)
+
+
+# ROTATIONS[shape_idx][rotation], built once at import
+ROTATIONS = _build_rotations()
+
+# Color names as used in puzzle files
+COLOR_NAMES = ["CYAN", "BLUE", "ORANGE", "YELLOW", "GREEN", "PURPLE", "RED"]
+
+# Actions accepted by TetrisEngine.step
+ACTIONS = ("left", "right", "rotate", "soft_drop", "hard_drop", "gravity")
+
+
+class Tetromino:
+    __slots__ = ("shape_idx", "rotation", "x", "y")
+
+    def __init__(self, shape_type: Optional[str] = None) -> None:
+        """Create a piece of the given type ("I", "J", ...), or a random one."""
+        if shape_type is None:
+            self.shape_idx = random.randrange(len(PIECE_TYPES))
+        else:
+            self.shape_idx = PIECE_INDEX[shape_type]
+        self.rotation = 0
+        self.x = GRID_WIDTH // 2 - ROTATIONS[self.shape_idx][0].width // 2
+        self.y = 0
+
+    @property
+    def shape_type(self) -> str:
+        return PIECE_TYPES[self.shape_idx]
+
+    @property
+    def color(self) -> Tuple[int, int, int]:
+        return COLORS[self.shape_idx]
+
+    @property
+    def state(self) -> Rotation:
+        """Precomputed data for the current rotation."""
+        return ROTATIONS[self.shape_idx][self.rotation]
+
+    @property
+    def shape(self) -> Tuple[Tuple[int, ...], ...]:
+        return ROTATIONS[self.shape_idx][self.rotation].shape
+
+    @property
+    def masks(self) -> Tuple[int, ...]:
+        """Row bitmasks of the current shape."""
+        return ROTATIONS[self.shape_idx][self.rotation].masks
+
+    def rotate(self) -> None:
+        """Rotate clockwise."""
+        self.rotation = (self.rotation + 1) % 4
+
+    def copy(self) -> "Tetromino":
+        piece = Tetromino.__new__(Tetromino)
+        piece.shape_idx = self.shape_idx
+        piece.rotation = self.rotation
+        piece.x = self.x
+        piece.y = self.y
+        return piece
+
+
+# CANONICAL_ROTATIONS[shape_idx][rotation] is the lowest rotation with the same
+# cells. Trimmed shapes make the I, S and Z half turns and every O turn identical.
+CANONICAL_ROTATIONS = tuple(
+    tuple(
+        next(r for r, other in enumerate(states) if other.shape == state.shape) for state in states
+    )
+    for states in ROTATIONS
+)
+
+
+class Placement(NamedTuple):
+    """A position a piece can lock in, and the actions that take it there.
+
+    ``moves`` ends in a hard drop; applying them with :meth:`TetrisEngine.step`
+    from the piece's current position locks it at (x, y) in ``rotation``.
+    """
+
+    x: int
+    rotation: int
+    y: int
+    moves: Tuple[str, ...]
+
+
+# _FREE_X[(mask, row)]: bitmask of the x offsets at which a piece row mask fits
+# into a board row without overlapping it or the walls. Bounded by the handful of
+# distinct piece row masks times the 1024 possible rows.
+_FREE_X: Dict[Tuple[int, int], int] = {}
+
+
+def _free_x(mask: int, row: int) -> int:
+    blocked = row | ~FULL_ROW
+    return sum(1 << x for x in range(GRID_WIDTH) if not (mask << x) & blocked)
+
+
+def _fit_masks(rows: Sequence[int], state: Rotation, top: int) -> List[int]:
+    """For each row y, a bitmask of the x at which state fits with its top at y.
+    ``top`` is the highest row with a filled cell (GRID_HEIGHT if none)."""
+    # Above the stack the piece fits wherever the walls let it
+    clear = min(max(top - state.height + 1, 0), GRID_HEIGHT - state.height + 1)
+    fits = [_OPEN_FITS[state.masks]] * clear
+    for y in range(clear, GRID_HEIGHT - state.height + 1):
+        fit = FULL_ROW
+        for i, mask in enumerate(state.masks):
+            key = (mask, rows[y + i])
+            free = _FREE_X.get(key)
+            if free is None:
+                free = _FREE_X[key] = _free_x(mask, rows[y + i])
+            fit &= free
+            if not fit:
+                break
+        fits.append(fit)
+    return fits + [0] * (state.height - 1)
+
+
+# _OPEN_FITS[masks]: the x at which a rotation state fits among empty rows
+_OPEN_FITS = {state.masks: _free_x(max(state.masks), 0) for states in ROTATIONS for state in states}
+
+
+def _flood(
+    rows: Sequence[int], piece: Tetromino
+) -> Optional[Tuple[List[List[int]], Dict[Tuple[int, int, int], Tuple[int, int]]]]:
+    """Flood the (x, rotation, y) states the piece can reach from where it is.
+
+    Returns, for each row, a bitmask of the x reachable in each rotation, and
+    the landing positions keyed by (x, canonical rotation, y) with the (x,
+    rotation) first found there. None if the piece doesn't fit where it is.
+    """
+    canonical = CANONICAL_ROTATIONS[piece.shape_idx]
+    top = next((y for y, row in enumerate(rows) if row), GRID_HEIGHT)
+    fits_by_shape: Dict[int, List[int]] = {}
+    for rotation, state in enumerate(ROTATIONS[piece.shape_idx]):
+        if canonical[rotation] == rotation:
+            fits_by_shape[rotation] = _fit_masks(rows, state, top)
+    fits = [fits_by_shape[canonical[rotation]] for rotation in range(4)]
+
+    start_y = piece.y
+    if start_y < 0 or not fits[piece.rotation][start_y] >> piece.x & 1:
+        return None
+    # Rows above this leave every rotation the same room as an empty board
+    open_until = top - max(state.height for state in ROTATIONS[piece.shape_idx]) + 1
+
+    # reach[y][rotation]: bitmask of the x reachable in that rotation on row y
+    reach = [[0] * 4 for _ in range(GRID_HEIGHT)]
+    entering = [0, 0, 0, 0]
+    entering[piece.rotation] = 1 << piece.x
+    landings: Dict[Tuple[int, int, int], Tuple[int, int]] = {}
+    row_reach = entering
+    for y in range(start_y, GRID_HEIGHT):
+        if y > start_y and y < open_until and entering == row_reach:
+            # Everything carried down into another open row, so it's closed already
+            row_reach = list(entering)
+        else:
+            row_reach = entering
+            changed = True
+            while changed:
+                changed = False
+                for rotation in range(4):
+                    fit = fits[rotation][y]
+                    spread = row_reach[rotation]
+                    while True:
+                        grown = (spread | spread << 1 | spread >> 1) & fit
+                        if grown == spread:
+                            break
+                        spread = grown
+                    turned = (rotation + 1) & 3
+                    row_reach[rotation] = spread
+                    extra = spread & fits[turned][y] & ~row_reach[turned]
+                    if extra:
+                        row_reach[turned] |= extra
+                        changed = True
+        reach[y] = row_reach
+
+        entering = [0, 0, 0, 0]
+        for rotation in range(4):
+            below = fits[rotation][y + 1] if y + 1 < GRID_HEIGHT else 0
+            entering[rotation] = row_reach[rotation] & below
+            landed = row_reach[rotation] & ~below
+            while landed:
+                bit = landed & -landed
+                landed ^= bit
+                x = bit.bit_length() - 1
+                key = (x, canonical[rotation], y)
+                if key not in landings:
+                    landings[key] = (x, rotation)
+        if not any(entering):
+            break
+    return reach, landings
+
+
+def find_landings(rows: Sequence[int], piece: Tetromino) -> List[Tuple[int, int, int]]:
+    """Every distinct (x, rotation, y) the piece can lock in from where it is,
+    as :func:`find_placements` finds them but without the moves.
+
+    Takes the board's rows alone, for lookahead searches that never play the
+    placements out.
+    """
+    flood = _flood(rows, piece)
+    if flood is None:
+        return []
+    return [(x, rotation, y) for (_, _, y), (x, rotation) in flood[1].items()]
+
+
+def find_placements(board: Board, piece: Tetromino) -> List[Placement]:
+    """Find every distinct position the piece can lock in from where it is.
+
+    Explores the (x, rotation, y) states reachable with left, right, rotate and
+    soft drop moves under the same collision rules as :meth:`TetrisEngine.step`.
+    Rotations that cover the same cells count as one placement. Each row is
+    flooded at once as bitmasks of x positions, one per rotation, and then
+    carried down to the next row.
+    """
+    flood = _flood(board.rows, piece)
+    if flood is None:
+        return []
+    reach, landings = flood
+    start_y = piece.y
+
+    # Shortest moves to every state on the starting row, shared by most paths
+    start = (piece.x, piece.rotation)
+    top_row = reach[start_y]
+    start_paths: Dict[Tuple[int, int], Tuple[str, ...]] = {start: ()}
+    frontier = [start]
+    for position in frontier:
+        sx, srot = position
+        path = start_paths[position]
+        for following, move in (
+            ((sx, (srot + 1) & 3), "rotate"),
+            ((sx - 1, srot), "left"),
+            ((sx + 1, srot), "right"),
+        ):
+            fx, frot = following
+            if fx >= 0 and top_row[frot] >> fx & 1 and following not in start_paths:
+                start_paths[following] = path + (move,)
+                frontier.append(following)
+
+    placements = []
+    for (_, _, y), (x, rotation) in landings.items():
+        moves = _path_to(reach, start_paths, start_y, x, rotation, y)
+        placements.append(Placement(x, rotation, y, moves + ("hard_drop",)))
+    return placements
+
+
+def _path_to(
+    reach: List[List[int]],
+    start_paths: Dict[Tuple[int, int], Tuple[str, ...]],
+    start_y: int,
+    x: int,
+    rotation: int,
+    y: int,
+) -> Tuple[str, ...]:
+    """Rebuild moves from the start to a reachable state, working back up the
+    board. Sideways moves and turns are made as high up as possible, and the
+    final straight fall is left out for the caller to hard drop."""
+    moves: List[str] = []  # Everything below the starting row, in reverse order
+    landing = True
+    while True:
+        top = y
+        while top > start_y and reach[top - 1][rotation] >> x & 1:
+            top -= 1
+        if not landing:
+            moves.extend(["soft_drop"] * (y - top))
+        landing = False
+        y = top
+        if y == start_y:
+            return start_paths[(x, rotation)] + tuple(reversed(moves))
+
+        # Search back along the row to where the piece came down
+        row = reach[y]
+        above = reach[y - 1]
+        came_from: Dict[Tuple[int, int], Tuple[Tuple[int, int], str]] = {}
+        frontier = [(x, rotation)]
+        for state in frontier:
+            sx, srot = state
+            if above[srot] >> sx & 1:
+                break
+            for previous, move in (
+                ((sx, (srot - 1) & 3), "rotate"),
+                ((sx + 1, srot), "left"),
+                ((sx - 1, srot), "right"),
+            ):
+                px, prot = previous
+                if px >= 0 and row[prot] >> px & 1 and previous not in came_from:
+                    came_from[previous] = (state, move)
+                    frontier.append(previous)
+        # Replay the row moves from that state forward, then step up a row
+        state = (sx, srot)
+        row_moves = []
+        while state != (x, rotation):
+            state, move = came_from[state]
+            row_moves.append(move)
+        moves.extend(reversed(row_moves))
+        moves.append("soft_drop")
+        x, rotation = sx, srot
+        y -= 1
+
+
+T = TypeVar("T")
+
+
+def _shallow_copy(obj: T) -> T:
+    """Copy an object's attributes without copy.copy's pickling machinery."""
+    clone = object.__new__(type(obj))
+    clone.__dict__.update(obj.__dict__)
+    return clone
+
+
+class TetrisEngine:
+    """Game state and rules for a single game of Tetris.
+
+    The engine knows nothing about input devices: callers advance it with
+    :meth:`step`, passing one of :data:`ACTIONS`. Time only passes through
+    :meth:`tick`, one fixed timestep of 1 / TICK_RATE seconds at a time, so a
+    game played back tick by tick is deterministic regardless of frame rate.
+
+    Pieces come from ``generator``, by default uniformly random pieces seeded
+    with ``seed``; with the same seed and inputs a game always plays out the
+    same way. The next ``preview_count`` pieces are queued up in ``preview``.
+    """
+
+    def __init__(
+        self,
+        puzzle: Optional[Puzzle] = None,
+        seed: Optional[int] = None,
+        generator: Optional[PieceGenerator] = None,
+        preview_count: int = 1,
+    ) -> None:
+        if preview_count < 1:
+            raise ValueError("preview_count must be at least 1")
+        self.board = Board()
+        self.generator = generator if generator is not None else PieceGenerator(seed)
+        self.current_piece: Optional[Tetromino] = None
+        self.preview: Deque[Tetromino] = deque(
+            Tetromino(PIECE_TYPES[self.generator.next_index()]) for _ in range(preview_count)
+        )
+        self.score = 0
+        self.level = 1
+        self.lines_cleared = 0
+        self.game_over = False
+        self.pieces_used = 0
+        self.fall_speed = BASE_FALL_SPEED
+        self.gravity_ticks = 0  # Ticks since the current piece last fell
+        self.puzzle = puzzle
+        self.is_puzzle_mode = puzzle is not None
+        # Called with the locked piece and the rows it cleared, before the next
+        # piece spawns. Renderers use this to update only what changed.
+        self.on_lock: Optional[Callable[[Tetromino, List[int]], None]] = None
+        # Last shadow result: (shape_idx, rotation, x, board version), the y it
+        # was computed from, and the landing row
+        self._shadow_key: Optional[Tuple[int, int, int, int]] = None
+        self._shadow_from = 0
+        self._shadow_y = 0
+        if self.is_puzzle_mode:
+            self.load_puzzle_grid()
+
+        # Initialize the first piece
+        self.current_piece = self.take_next_piece()
+
+        # Check if game is blocked from the start
+        if self.check_blockout(self.current_piece):
+            self.game_over = True
+
+    @property
+    def next_piece(self) -> Tetromino:
+        """The piece that spawns after the current one."""
+        return self.preview[0]
+
+    def take_next_piece(self) -> Tetromino:
+        """Remove the first piece from the preview queue and top the queue up."""
+        self.preview.append(Tetromino(PIECE_TYPES[self.generator.next_index()]))
+        return self.preview.popleft()
+
+    def copy(self) -> "TetrisEngine":
+        """Return an independent copy of the game, for search.
+
+        The board, pieces, piece generator and puzzle progress are all copied,
+        so stepping the copy leaves this engine untouched. ``on_lock`` is not
+        carried over.
+        """
+        clone = _shallow_copy(self)
+        clone.board = self.board.copy()
+        clone.generator = self.generator.copy()
+        clone.current_piece = self.current_piece.copy() if self.current_piece else None
+        clone.preview = deque(piece.copy() for piece in self.preview)
+        if self.puzzle:
+            clone.puzzle = _shallow_copy(self.puzzle)
+            clone.puzzle.goals = [_shallow_copy(goal) for goal in self.puzzle.goals]
+        clone.on_lock = None
+        return clone
+
+    def load_puzzle_grid(self) -> None:
+        """Load the initial grid state from puzzle data."""
+        if not self.puzzle:
+            return
+
+        for y, row in enumerate(self.puzzle.grid_data):
+            for x, cell in enumerate(row):
+                if cell is not None:
+                    color_name = cell.upper()
+                    if color_name in COLOR_NAMES:
+                        self.board.set_cell(x, y, COLOR_NAMES.index(color_name) + 1)
+
+    def update_puzzle_goals(self) -> None:
+        """Update progress on puzzle goals."""
+        if not self.is_puzzle_mode or not self.puzzle:
+            return
+
+        puzzle = self.puzzle  # Local variable to help type checker
+        for goal in puzzle.goals:
+            if goal.goal_type == "clear_lines":
+                goal.update(self.lines_cleared)
+            elif goal.goal_type == "max_pieces":
+                # For max_pieces, we check if we're still under the limit
+                goal.update(self.pieces_used)
+                if goal.current_value > goal.target_value:
+                    self.game_over = True
+            elif goal.goal_type == "score":
+                goal.update(self.score)
+            elif goal.goal_type == "pattern":
+                # Check if the pattern matches at the specified location
+                goal_any = cast(Any, goal)  # Cast to Any to access pattern attributes
+                pattern = goal_any.pattern
+                pattern_x = goal_any.pattern_x
+                pattern_y = goal_any.pattern_y
+                matches = 0
+
+                for y in range(len(pattern)):
+                    for x in range(len(pattern[0])):
+                        grid_y = pattern_y + y
+                        grid_x = pattern_x + x
+
+                        if pattern[y][x] is not None:
+                            if (
+                                grid_y < 0
+                                or grid_y >= GRID_HEIGHT
+                                or grid_x < 0
+                                or grid_x >= GRID_WIDTH
+                            ):
+                                continue
+
+                            color_idx = self.board.color_index(grid_x, grid_y)
+                            color_name = COLOR_NAMES[color_idx - 1] if color_idx else None
+                            if color_name == pattern[y][x]:
+                                matches += 1
+
+                goal.update(matches)
+
+        # Check if all goals are achieved
+        # Use a separate check for puzzle completion to help type checker
+        if puzzle and puzzle.is_completed():
+            self.game_over = True
+
+    def check_blockout(self, piece: Optional[Tetromino]) -> bool:
+        """Check if a piece can be placed at its starting position."""
+        if not piece:
+            return False
+        return self.board.collides(piece.masks, piece.x, piece.y)
+
+    def add_drop_score(self, distance: int, is_hard_drop: bool = False) -> None:
+        """Add score for dropping pieces. Hard drops score more than soft drops."""
+        if is_hard_drop:
+            self.score += distance * HARD_DROP_SCORE
+        else:
+            self.score += distance * SOFT_DROP_SCORE
+
+    def check_collision(self, x_offset: int = 0, y_offset: int = 0) -> bool:
+        piece = self.current_piece
+        if not piece:
+            return False
+        return self.board.collides(piece.masks, piece.x + x_offset, piece.y + y_offset)
+
+    def lock_piece(self) -> None:
+        piece = self.current_piece
+        if not piece:
+            return
+        if piece.y < 0:
+            # Part of the piece would lock above the top of the grid
+            self.game_over = True
+            return
+        state = piece.state
+        self.board.place(state.masks, piece.x, piece.y, piece.shape_idx + 1)
+
+        self.gravity_ticks = 0  # The next piece gets a full fall interval
+        self.pieces_used += 1  # Increment pieces used counter
+        # Only rows the piece was written into can have become full
+        cleared_rows = self.clear_lines(piece.y, piece.y + state.height)
+        if self.on_lock:
+            self.on_lock(piece, cleared_rows)
+        self.current_piece = self.take_next_piece()
+
+        # Check if the new piece can be placed
+        if self.check_blockout(self.current_piece):
+            self.game_over = True
+
+        if self.is_puzzle_mode:
+            self.update_puzzle_goals()
+
+    def update_level(self) -> None:
+        """Update level based on lines cleared and adjust fall speed."""
+        new_level = (self.lines_cleared // LINES_PER_LEVEL) + 1
+        if new_level != self.level:
+            self.level = new_level
+            # Calculate new fall speed with a minimum limit
+            self.fall_speed = max(
+                MIN_FALL_SPEED, BASE_FALL_SPEED - (SPEED_DECREASE * (self.level - 1))
+            )
+
+    def clear_lines(self, top: int = 0, bottom: int = GRID_HEIGHT) -> List[int]:
+        """Clear full rows in [top, bottom) and score them.
+
+        Returns the indices of the cleared rows.
+        """
+        cleared_rows = self.board.clear_full_rows(top, bottom)
+        lines_cleared = len(cleared_rows)
+
+        # Update score and level
+        if lines_cleared > 0:
+            self.score += (100 * lines_cleared) * lines_cleared  # Bonus for multiple lines
+            self.lines_cleared += lines_cleared
+            self.update_level()
+
+            # Check puzzle goals after clearing lines
+            if self.is_puzzle_mode:
+                self.update_puzzle_goals()
+                if self.puzzle.is_completed():  # type: ignore
+                    self.game_over = True
+
+        return cleared_rows
+
+    def placements(self) -> List[Placement]:
+        """Every distinct position the current piece can reach and lock in."""
+        if self.game_over or not self.current_piece:
+            return []
+        return find_placements(self.board, self.current_piece)
+
+    def get_shadow_position(self) -> int:
+        """Calculate the lowest possible position for the current piece."""
+        piece = self.current_piece
+        if not piece:
+            return 0
+
+        # Every row between where the cached result was computed from and the
+        # landing row is free, so it still holds as the piece falls.
+        key = (piece.shape_idx, piece.rotation, piece.x, self.board.version)
+        if key == self._shadow_key and self._shadow_from <= piece.y <= self._shadow_y:
+            return self._shadow_y
+
+        state = piece.state
+        self._shadow_key = key
+        self._shadow_from = piece.y
+        self._shadow_y = self.board.drop_row(state.masks, state.bottoms, piece.x, piece.y)
+        return self._shadow_y
+
+    @property
+    def gravity_interval(self) -> int:
+        """Number of ticks between gravity steps at the current level."""
+        return max(1, round(self.fall_speed * TICK_RATE))
+
+    def ticks_until_gravity(self) -> int:
+        """Number of ticks until the next gravity step."""
+        return max(1, self.gravity_interval - self.gravity_ticks)
+
+    def tick(self) -> bool:
+        """Advance the game by one fixed timestep, applying gravity when due.
+
+        Returns True if the game state changed.
+        """
+        if self.game_over or not self.current_piece:
+            return False
+        self.gravity_ticks += 1
+        if self.gravity_ticks < self.gravity_interval:
+            return False
+        self.gravity_ticks = 0
+        return self.step("gravity")
+
+    def step(self, action: str) -> bool:
+        """Apply one of ACTIONS to the current piece.
+
+        "gravity" moves the piece down one row, locking it if it cannot fall.
+        Returns True if the action changed the game state.
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action: {action}")
+        if self.game_over or not self.current_piece:
+            return False
+
+        piece = self.current_piece
+        if action == "left":
+            if self.check_collision(x_offset=-1):
+                return False
+            piece.x -= 1
+        elif action == "right":
+            if self.check_collision(x_offset=1):
+                return False
+            piece.x += 1
+        elif action == "rotate":
+            original_rotation = piece.rotation
+            piece.rotate()
+            if self.check_collision():
+                piece.rotation = original_rotation
+                return False
+        elif action == "soft_drop":
+            if self.check_collision(y_offset=1):
+                return False
+            piece.y += 1
+            self.add_drop_score(1)  # Score for each cell dropped
+        elif action == "hard_drop":
+            start_y = piece.y
+            piece.y = self.get_shadow_position()
+            self.add_drop_score(piece.y - start_y, is_hard_drop=True)
+            self.lock_piece()
+        elif action == "gravity":
+            if not self.check_collision(y_offset=1):
+                piece.y += 1
+            else:
+                self.lock_piece()
+        return True
@@ -0,0 +1,89 @@
+"""Gym-style reinforcement learning environment over the Tetris engine.
+
+Follows the Gymnasium API (``reset`` returns ``(observation, info)``, ``step``
+returns ``(observation, reward, terminated, truncated, info)``) without
+depending on it. Observations are NumPy views straight over the board's color
+plane, so producing one copies nothing: callers that keep an observation across
+steps must copy it themselves.
+"""
+
+import random
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from board import GRID_HEIGHT, GRID_WIDTH
+from engine import ACTIONS, TetrisEngine
+from randomizer import make_generator
+
+Observation = npt.NDArray[np.uint8]
+
+
+class Discrete:
+    """The integers ``0 <= action < n``, as in Gymnasium's ``spaces.Discrete``."""
+
+    def __init__(self, n: int, seed: Optional[int] = None) -> None:
+        self.n = n
+        self.rng = random.Random(seed)
+
+    def sample(self) -> int:
+        return self.rng.randrange(self.n)
+
+    def contains(self, action: int) -> bool:
+        return 0 <= action < self.n
+
+
+class TetrisEnv:
+    """One game of Tetris as an environment.
+
+    Actions are indices into ``engine.ACTIONS`` and the reward is the score
+    gained by the step. The observation is a ``(GRID_HEIGHT, GRID_WIDTH)``
+    uint8 view of the settled cells (0 for empty, otherwise a color index plus
+    one); the falling piece is described in ``info``. Episodes end when the
+    game does, or are truncated after ``max_steps`` steps if given.
+    """
+
+    def __init__(self, randomizer: str = "uniform", max_steps: Optional[int] = None) -> None:
+        self.randomizer = randomizer
+        self.max_steps = max_steps
+        self.action_space = Discrete(len(ACTIONS))
+        self.engine = TetrisEngine(generator=make_generator(self.randomizer))
+        self.observation = self.view_board()
+        self.steps = 0
+
+    def view_board(self) -> Observation:
+        """Wrap the engine's color plane in an array without copying it."""
+        colors = np.frombuffer(self.engine.board.colors, dtype=np.uint8)
+        return colors.reshape(GRID_HEIGHT, GRID_WIDTH)
+
+    def info(self) -> Dict[str, Any]:
+        engine = self.engine
+        piece = engine.current_piece
+        return {
+            "piece": piece.shape_idx if piece else None,
+            "rotation": piece.rotation if piece else None,
+            "x": piece.x if piece else None,
+            "y": piece.y if piece else None,
+            "next_piece": engine.next_piece.shape_idx,
+            "score": engine.score,
+            "lines_cleared": engine.lines_cleared,
+        }
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[Observation, Dict[str, Any]]:
+        """Start a new game, seeded for a reproducible piece sequence if given."""
+        self.engine = TetrisEngine(generator=make_generator(self.randomizer, seed))
+        self.observation = self.view_board()
+        self.steps = 0
+        return self.observation, self.info()
+
+    def step(self, action: int) -> Tuple[Observation, int, bool, bool, Dict[str, Any]]:
+        """Apply an action and return (observation, reward, terminated, truncated, info)."""
+        if not self.action_space.contains(action):
+            raise ValueError(f"Unknown action: {action}")
+        engine = self.engine
+        score = engine.score
+        engine.step(ACTIONS[action])
+        self.steps += 1
+        truncated = self.max_steps is not None and self.steps >= self.max_steps
+        return self.observation, engine.score - score, engine.game_over, truncated, self.info()
@@ -0,0 +1,150 @@
+"""Beam search over the current piece and the preview queue.
+
+:class:`BeamPlanner` places the current piece every way it can, keeps the
+``beam_width`` best resulting boards, places the first preview piece on each
+of those, and so on down the queue. Boards reached by different placement
+orders are only expanded once. The search is anytime: with a ``time_budget``
+it returns the best plan from the deepest level it finished.
+
+The placements found for each board and piece are kept in a transposition
+table keyed on the board's Zobrist hash, so the boards the next move's search
+shares with this one aren't expanded all over again.
+"""
+
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from autoplay import BoardProfile, Evaluator, Features, linear_evaluator
+from board import Board
+from engine import ROTATIONS, Placement, TetrisEngine, Tetromino, find_placements
+from transposition import TranspositionTable
+
+
+class Plan(NamedTuple):
+    """Placements for the current piece and the preview pieces after it."""
+
+    placements: Tuple[Placement, ...]
+    value: float
+    lines_cleared: int
+
+
+class _Node(NamedTuple):
+    rows: Tuple[int, ...]
+    value: float
+    lines_cleared: int
+    placements: Tuple[Placement, ...]
+
+
+class _Child(NamedTuple):
+    """A placement on a board, the board it leaves and its features."""
+
+    placement: Placement
+    rows: Tuple[int, ...]
+    features: Features
+
+
+def _blocks_spawn(rows: Sequence[int], piece: Tetromino) -> bool:
+    """Check if a piece at its spawn position overlaps the rows."""
+    return any(rows[piece.y + i] & mask << piece.x for i, mask in enumerate(piece.masks))
+
+
+class BeamPlanner:
+    """Plans placements for the current piece and up to ``depth`` preview
+    pieces (all of the preview by default).
+
+    Leaves are scored by ``evaluate``, as for :class:`autoplay.AutoPlayer`,
+    with lines cleared counted over the whole plan. ``time_budget`` is in
+    seconds; None searches to full depth whatever it takes. ``table_size`` is
+    the number of buckets in the table of expanded boards.
+    """
+
+    def __init__(
+        self,
+        evaluate: Optional[Evaluator] = None,
+        beam_width: int = 24,
+        depth: Optional[int] = None,
+        time_budget: Optional[float] = 0.05,
+        table_size: int = 1 << 7,
+    ) -> None:
+        self.evaluate = evaluate if evaluate is not None else linear_evaluator()
+        self.beam_width = beam_width
+        self.depth = depth
+        self.time_budget = time_budget
+        self.table: TranspositionTable[List[_Child]] = TranspositionTable(table_size)
+
+    def plan(self, engine: TetrisEngine) -> Optional[Plan]:
+        """Search for the best plan from the engine's current state, or None
+        if the current piece has nowhere to go."""
+        piece = engine.current_piece
+        if engine.game_over or not piece:
+            return None
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        upcoming = [Tetromino(queued.shape_type) for queued in engine.preview]
+        if self.depth is not None:
+            upcoming = upcoming[: self.depth]
+
+        self.table.new_search()
+        beam = [_Node(tuple(engine.board.rows), 0.0, 0, ())]
+        best: Optional[_Node] = None
+        for level, current in enumerate([piece] + upcoming):
+            spawn_next = upcoming[level] if level < len(upcoming) else None
+            children = self.expand(beam, current, spawn_next, deadline if best else None)
+            if children is None:
+                break  # Out of time; the previous level's best stands
+            if not children:
+                break  # Every line of play ends the game here
+            beam = children
+            best = beam[0]
+        if best is None:
+            return None
+        return Plan(best.placements, best.value, best.lines_cleared)
+
+    def expand(
+        self,
+        beam: List[_Node],
+        piece: Tetromino,
+        spawn_next: Optional[Tetromino],
+        deadline: Optional[float],
+    ) -> Optional[List[_Node]]:
+        """Place piece on every board in the beam and return the best distinct
+        resulting boards, best first. Returns None if the deadline passes."""
+        evaluate = self.evaluate
+        children: Dict[Tuple[int, ...], _Node] = {}
+        for node in beam:
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            for placement, rows, features in self.children(node, piece):
+                if rows in children:
+                    continue  # Transposition: reached this board another way
+                if spawn_next and _blocks_spawn(rows, spawn_next):
+                    continue  # The next piece couldn't spawn
+                lines = node.lines_cleared + features.lines_cleared
+                value = evaluate(features._replace(lines_cleared=lines))
+                children[rows] = _Node(rows, value, lines, node.placements + (placement,))
+        ranked = sorted(children.values(), key=lambda child: child.value, reverse=True)
+        return ranked[: self.beam_width]
+
+    def children(self, node: _Node, piece: Tetromino) -> List[_Child]:
+        """Every placement of piece on the node's board, from the table if the
+        board was expanded for the same piece before."""
+        board = Board.from_rows(node.rows)
+        table_key = board.zobrist ^ hash((piece.shape_idx, piece.rotation, piece.x, piece.y))
+        cached = self.table.get(table_key)
+        if cached is not None:
+            return cached
+
+        profile = BoardProfile(board.rows, board.heights)
+        states = ROTATIONS[piece.shape_idx]
+        children = []
+        for placement in find_placements(board, piece):
+            x, rotation, y = placement.x, placement.rotation, placement.y
+            rows, _ = profile.place(states[rotation], x, y)
+            features = profile.features(piece.shape_idx, rotation, x, y)
+            children.append(_Child(placement, tuple(rows), features))
+        self.table.store(table_key, 0, children)
+        return children
+
+    def choose(self, engine: TetrisEngine) -> Optional[Placement]:
+        """The first placement of the best plan, for use as a player."""
+        plan = self.plan(engine)
+        return plan.placements[0] if plan else None
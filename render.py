@@ -0,0 +1,152 @@
+"""Pygame rendering helpers shared by the game screen and the menus."""
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import pygame
+
+from engine import ROTATIONS
+
+Color = Tuple[int, int, int]
+RGBA = Tuple[int, int, int, int]
+
+
+@lru_cache(maxsize=None)
+def get_font(size: int) -> pygame.font.Font:
+    """Return the default font at the given size, shared between screens so
+    cached text stays valid when a screen is recreated."""
+    return pygame.font.Font(None, size)
+
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces.
+
+    Rasterizing text is one of the more expensive things done per frame, and
+    most text on screen (labels, menu options, the HUD between score changes)
+    is identical from one frame to the next.
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        self.max_size = max_size
+        self.surfaces: "OrderedDict[Tuple[pygame.font.Font, str, Color, bool], pygame.Surface]" = (
+            OrderedDict()
+        )
+
+    def render(
+        self, font: pygame.font.Font, text: str, color: Color, antialias: bool = True
+    ) -> pygame.Surface:
+        """Return the surface for the given text, rendering it on a cache miss."""
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+# Shared by every screen, so menu text survives between visits
+text_cache = TextCache()
+
+
+def render_text(
+    font: pygame.font.Font, text: str, color: Color, antialias: bool = True
+) -> pygame.Surface:
+    """Render text through the shared cache."""
+    return text_cache.render(font, text, color, antialias)
+
+
+def wrap_text(font: pygame.font.Font, text: str, max_width: int) -> List[str]:
+    """Break text into lines no wider than max_width, splitting on spaces.
+
+    A single word wider than max_width gets a line to itself.
+    """
+    lines: List[str] = []
+    current_line: List[str] = []
+
+    for word in text.split():
+        test_line = " ".join(current_line + [word])
+        if font.size(test_line)[0] <= max_width:
+            current_line.append(word)
+        else:
+            if current_line:
+                lines.append(" ".join(current_line))
+            current_line = [word]
+    if current_line:
+        lines.append(" ".join(current_line))
+    return lines
+
+
+class TextBlock:
+    """Text wrapped to a fixed width.
+
+    Line breaks are measured once when the block is created and each line is
+    rendered once per color, so drawing it is just a few blits.
+    """
+
+    def __init__(self, font: pygame.font.Font, text: str, max_width: int) -> None:
+        self.font = font
+        self.lines = wrap_text(font, text, max_width)
+        self.surfaces: Dict[Color, List[pygame.Surface]] = {}
+
+    def render(self, color: Color) -> List[pygame.Surface]:
+        """Return one surface per line in the given color."""
+        surfaces = self.surfaces.get(color)
+        if surfaces is None:
+            surfaces = [self.font.render(line, True, color) for line in self.lines]
+            self.surfaces[color] = surfaces
+        return surfaces
+
+    def draw(self, target: pygame.Surface, x: int, y: int, color: Color, line_height: int) -> int:
+        """Blit the lines downward from (x, y). Returns the y below the last line."""
+        for surface in self.render(color):
+            target.blit(surface, (x, y))
+            y += line_height
+        return y
+
+
+class BlockAtlas:
+    """One pre-rendered block surface per piece color and per shadow color.
+
+    Boards are drawn by handing lists of (block, position) pairs to
+    ``Surface.blits`` rather than issuing a ``draw.rect`` per cell. Ghost pieces
+    are pre-assembled too, one surface per piece and rotation, so drawing the
+    ghost is a single small alpha blit.
+    """
+
+    def __init__(
+        self, colors: Sequence[Color], shadow_colors: Sequence[RGBA], block_size: int
+    ) -> None:
+        # Blocks leave a 1px gap on the right and bottom so grid lines show through
+        size = (block_size - 1, block_size - 1)
+        self.blocks: List[pygame.Surface] = []
+        for color in colors:
+            block = pygame.Surface(size).convert()
+            block.fill(color)
+            self.blocks.append(block)
+        self.shadows: List[pygame.Surface] = []
+        for shadow_color in shadow_colors:
+            shadow = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            shadow.fill(shadow_color)
+            self.shadows.append(shadow)
+
+        # ghosts[shape_idx][rotation], sized to the rotation's bounding box
+        self.ghosts: List[List[pygame.Surface]] = []
+        for shadow, rotations in zip(self.shadows, ROTATIONS):
+            states = []
+            for state in rotations:
+                ghost = pygame.Surface(
+                    (state.width * block_size, state.height * block_size), pygame.SRCALPHA
+                ).convert_alpha()
+                ghost.fill((0, 0, 0, 0))
+                ghost.blits(
+                    [(shadow, (x * block_size, y * block_size)) for x, y in state.cells],
+                    doreturn=False,
+                )
+                states.append(ghost)
+            self.ghosts.append(states)
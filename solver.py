@@ -0,0 +1,349 @@
+"""Puzzle solver.
+
+Finds the fewest pieces that meet a puzzle's goals for a given piece sequence.
+The search tries every placement of every piece, as listed by
+:meth:`engine.TetrisEngine.placements`, and plays each one out on a copy of the
+engine, so goals are scored by the same ``update_puzzle_goals`` the game uses.
+
+Depth is deepened one piece at a time, so the first solution found uses as few
+pieces as possible. On each pass the subtrees under the first piece's
+placements are shared out over a process pool. Branches that can't reach the
+line or score goals in the pieces left, however well they are played, are cut
+off. Each worker keeps a transposition table of the positions it has ruled
+out and with how many pieces left, keyed on the board's Zobrist hash, so
+positions reached again by another order of play are skipped.
+
+Run ``python solver.py puzzles/clearing_puzzles/stairway.json --seed 0``.
+"""
+
+import argparse
+import multiprocessing as mp
+import time
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from board import GRID_HEIGHT, GRID_WIDTH
+from engine import HARD_DROP_SCORE, PIECE_INDEX, PIECE_TYPES, Placement, TetrisEngine
+from puzzle import Puzzle, load_puzzle_from_file
+from randomizer import GENERATORS, SequenceGenerator, make_generator
+from transposition import TranspositionTable
+
+# Goals update_puzzle_goals keeps score of, and that the solver aims for
+TRACKED_GOALS = ("clear_lines", "score", "pattern")
+
+# Piece limit for puzzles without a max_pieces goal
+DEFAULT_MAX_PIECES = 10
+
+# Most points a single line can be worth, as part of a four-line clear
+MAX_LINE_SCORE = 400
+
+# How many nodes are searched between deadline checks
+CHECK_INTERVAL = 1024
+
+# Buckets in each worker's transposition table
+TABLE_SIZE = 1 << 16
+
+
+class Solution(NamedTuple):
+    """Placements that meet a puzzle's goals, one per piece in ``pieces``."""
+
+    placements: Tuple[Placement, ...]
+    pieces: Tuple[str, ...]
+    score: int
+    lines_cleared: int
+
+
+class SolveResult(NamedTuple):
+    """The outcome of a search.
+
+    ``solution`` is None if there is none within ``max_pieces`` pieces, or if
+    the time ran out first, in which case ``complete`` is False.
+    """
+
+    solution: Optional[Solution]
+    max_pieces: int
+    nodes: int
+    seconds: float
+    complete: bool
+    ignored_goals: Tuple[str, ...]
+
+
+class _Subtree(NamedTuple):
+    placements: Optional[Tuple[Placement, ...]]
+    nodes: int
+    complete: bool
+
+
+def piece_limit(puzzle: Puzzle, max_pieces: Optional[int] = None) -> int:
+    """How many pieces to search: as many as the puzzle's max_pieces goals
+    allow, or max_pieces if lower, or DEFAULT_MAX_PIECES if neither is set."""
+    limits = [goal.target_value for goal in puzzle.goals if goal.goal_type == "max_pieces"]
+    if max_pieces is not None:
+        limits.append(max_pieces)
+    return min(limits) if limits else DEFAULT_MAX_PIECES
+
+
+def goals_met(engine: TetrisEngine) -> bool:
+    """Check the goals the engine tracks. max_pieces is a limit rather than a
+    target here: the search never goes past it."""
+    if not engine.puzzle:
+        return False
+    return all(
+        goal.is_achieved() for goal in engine.puzzle.goals if goal.goal_type in TRACKED_GOALS
+    )
+
+
+def _within_reach(engine: TetrisEngine, remaining: int) -> bool:
+    """Check the line and score goals can still be met with remaining pieces.
+
+    Every line takes GRID_WIDTH cells and each piece adds four, and no line is
+    worth more than MAX_LINE_SCORE, so these are upper bounds however the
+    pieces are played.
+    """
+    if not engine.puzzle:
+        return False
+    cells = sum(bin(row).count("1") for row in engine.board.rows)
+    lines = min(4 * remaining, (cells + 4 * remaining) // GRID_WIDTH)
+    for goal in engine.puzzle.goals:
+        if goal.goal_type == "clear_lines":
+            if engine.lines_cleared + lines < goal.target_value:
+                return False
+        elif goal.goal_type == "score":
+            points = MAX_LINE_SCORE * lines + HARD_DROP_SCORE * GRID_HEIGHT * remaining
+            if engine.score + points < goal.target_value:
+                return False
+    return True
+
+
+def _position_key(engine: TetrisEngine, with_colors: bool) -> int:
+    """Hash of everything about a position that the rest of the search
+    depends on.
+
+    The piece sequence is fixed, so the pieces used also decide what comes next.
+    """
+    goals = engine.puzzle.goals if engine.puzzle else []
+    key = engine.board.zobrist ^ hash(
+        (engine.pieces_used, tuple(goal.current_value for goal in goals))
+    )
+    if with_colors:
+        key ^= hash(bytes(engine.board.colors))
+    return key
+
+
+def play(engine: TetrisEngine, placement: Placement) -> TetrisEngine:
+    """Return a copy of the engine with the placement played out."""
+    child = engine.copy()
+    for move in placement.moves:
+        child.step(move)
+    return child
+
+
+# Positions this process has found no solution from, with the most pieces left
+# they were searched with. Set up afresh for every solve by _start_worker.
+_table: TranspositionTable[bool] = TranspositionTable(1)
+
+
+def _start_worker(table_size: int) -> None:
+    global _table
+    _table = TranspositionTable(table_size)
+
+
+class _DepthFirst:
+    """Depth-limited search below one position."""
+
+    def __init__(self, table: TranspositionTable[bool], with_colors: bool, deadline: float) -> None:
+        self.table = table
+        self.with_colors = with_colors
+        self.deadline = deadline
+        self.nodes = 0
+        self.timed_out = False
+
+    def search(self, engine: TetrisEngine, remaining: int) -> Optional[List[Placement]]:
+        """Placements that meet the goals within remaining pieces, in reverse
+        order, or None."""
+        if goals_met(engine):
+            return []
+        if not remaining or engine.game_over or not _within_reach(engine, remaining):
+            return None
+        key = _position_key(engine, self.with_colors)
+        if self.table.get(key, remaining) is not None:
+            return None  # Reached by another order of play, and ruled out already
+
+        # Low placements first: they are the ones that complete lines
+        for placement in sorted(engine.placements(), key=lambda p: -p.y):
+            self.nodes += 1
+            if self.nodes % CHECK_INTERVAL == 0 and time.time() > self.deadline:
+                self.timed_out = True
+            if self.timed_out:
+                return None
+            found = self.search(play(engine, placement), remaining - 1)
+            if found is not None:
+                found.append(placement)
+                return found
+        if self.timed_out:
+            return None  # The last child was cut short, so nothing is ruled out
+        self.table.store(key, remaining, False)
+        return None
+
+
+def _solve_subtree(task: Tuple[TetrisEngine, Placement, int, bool, float]) -> _Subtree:
+    """Pool task: search below the position after one first-piece placement."""
+    engine, placement, remaining, with_colors, deadline = task
+    search = _DepthFirst(_table, with_colors, deadline)
+    found = search.search(engine, remaining)
+    if found is None:
+        return _Subtree(None, search.nodes, not search.timed_out)
+    return _Subtree((placement,) + tuple(reversed(found)), search.nodes, True)
+
+
+def deal(count: int, randomizer: str = "uniform", seed: Optional[int] = None) -> List[int]:
+    """The first count piece indices from one of the GENERATORS."""
+    generator = make_generator(randomizer, seed)
+    return [generator.next_index() for _ in range(count)]
+
+
+def solve(
+    puzzle: Puzzle,
+    pieces: Sequence[int],
+    max_pieces: Optional[int] = None,
+    workers: Optional[int] = None,
+    time_limit: Optional[float] = 60.0,
+    table_size: int = TABLE_SIZE,
+) -> SolveResult:
+    """Search for the fewest placements of pieces (indices into
+    ``engine.PIECE_TYPES``, dealt in order) that meet the puzzle's goals.
+
+    The search goes as deep as :func:`piece_limit` allows. Progress is kept
+    on copies of the puzzle's goals, so the puzzle itself is left untouched.
+    ``table_size`` is the number of buckets in each worker's transposition
+    table.
+    """
+    limit = piece_limit(puzzle, max_pieces)
+    with_colors = any(goal.goal_type == "pattern" for goal in puzzle.goals)
+    ignored = tuple(
+        sorted({goal.goal_type for goal in puzzle.goals} - set(TRACKED_GOALS) - {"max_pieces"})
+    )
+    start = time.time()
+    deadline = start + time_limit if time_limit is not None else float("inf")
+
+    # Never played on directly: play() only steps copies
+    root = TetrisEngine(puzzle=puzzle, generator=SequenceGenerator(pieces))
+
+    def result(
+        placements: Optional[Tuple[Placement, ...]], nodes: int, complete: bool
+    ) -> SolveResult:
+        solution = None
+        if placements is not None:
+            end = root
+            for placement in placements:
+                end = play(end, placement)
+            dealt = tuple(PIECE_TYPES[pieces[i % len(pieces)]] for i in range(len(placements)))
+            solution = Solution(placements, dealt, end.score, end.lines_cleared)
+        return SolveResult(solution, limit, nodes, time.time() - start, complete, ignored)
+
+    if goals_met(root):
+        return result((), 0, True)
+    if not _within_reach(root, limit) or root.game_over:
+        return result(None, 0, True)
+
+    first = [(placement, play(root, placement)) for placement in root.placements()]
+    nodes = len(first)
+    workers = workers or mp.cpu_count()
+    pool = None
+    if workers > 1:
+        pool = mp.Pool(workers, initializer=_start_worker, initargs=(table_size,))
+    else:
+        _start_worker(table_size)
+    try:
+        for depth in range(1, limit + 1):
+            tasks = [
+                (child, placement, depth - 1, with_colors, deadline) for placement, child in first
+            ]
+            outcomes: Iterator[_Subtree] = (
+                pool.imap(_solve_subtree, tasks) if pool else map(_solve_subtree, tasks)
+            )
+            complete = True
+            for outcome in outcomes:
+                nodes += outcome.nodes
+                complete = complete and outcome.complete
+                if outcome.placements is not None:
+                    return result(outcome.placements, nodes, True)
+            if not complete:
+                return result(None, nodes, False)
+        return result(None, nodes, True)
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+
+
+def _count(count: int, noun: str) -> str:
+    return f"{count} {noun}{'' if count == 1 else 's'}"
+
+
+def describe(result: SolveResult, name: str) -> str:
+    """A report of a search for printing."""
+    lines = []
+    solution = result.solution
+    if solution is not None:
+        lines.append(
+            f"{name}: solved with {_count(len(solution.placements), 'piece')} "
+            f"(limit {result.max_pieces}), score {solution.score}, "
+            f"{_count(solution.lines_cleared, 'line')}"
+        )
+        for i, (piece, placement) in enumerate(zip(solution.pieces, solution.placements), 1):
+            lines.append(
+                f"  {i}. {piece} x={placement.x} rotation={placement.rotation} "
+                f"y={placement.y}: {' '.join(placement.moves)}"
+            )
+    elif result.complete:
+        lines.append(f"{name}: no solution within {_count(result.max_pieces, 'piece')}")
+    else:
+        lines.append(f"{name}: no solution found before the time limit")
+    rate = result.nodes / result.seconds if result.seconds else 0.0
+    lines.append(f"  {result.nodes:,} nodes in {result.seconds:.2f}s ({rate:,.0f} nodes/s)")
+    if result.ignored_goals:
+        lines.append(f"  ignored goals the engine doesn't track: {', '.join(result.ignored_goals)}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the fewest pieces that solve a puzzle.")
+    parser.add_argument("puzzles", nargs="+", help="puzzle JSON files")
+    parser.add_argument(
+        "--pieces", help="the piece sequence to solve with, e.g. TIJLOSZ; dealt at random if unset"
+    )
+    parser.add_argument(
+        "--randomizer",
+        choices=sorted(GENERATORS),
+        default="uniform",
+        help="how the piece sequence is dealt when --pieces is unset",
+    )
+    parser.add_argument("--seed", type=int, help="seed for the dealt piece sequence")
+    parser.add_argument(
+        "--max-pieces",
+        type=int,
+        help=f"search no deeper than this (default: the puzzle's limit, or {DEFAULT_MAX_PIECES})",
+    )
+    parser.add_argument("--workers", type=int, help="search processes (default: one per CPU)")
+    parser.add_argument(
+        "--time-limit", type=float, default=60.0, help="seconds to search each puzzle for"
+    )
+    args = parser.parse_args()
+
+    for filename in args.puzzles:
+        try:
+            puzzle = load_puzzle_from_file(filename)
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            print(f"{filename}: could not load: {e}")
+            continue
+        if args.pieces:
+            unknown = set(args.pieces.upper()) - set(PIECE_TYPES)
+            if unknown:
+                parser.error(f"unknown piece types: {''.join(sorted(unknown))}")
+            sequence = [PIECE_INDEX[shape_type] for shape_type in args.pieces.upper()]
+        else:
+            # One piece per placement, and the preview after the last
+            sequence = deal(piece_limit(puzzle, args.max_pieces) + 1, args.randomizer, args.seed)
+        print(f"pieces: {''.join(PIECE_TYPES[index] for index in sequence)}")
+        outcome = solve(puzzle, sequence, args.max_pieces, args.workers, args.time_limit)
+        print(describe(outcome, puzzle.name))
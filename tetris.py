@@ -1,11 +1,27 @@
+import argparse
 import os
-import random
 import sys
-from typing import Any, List, Optional, Tuple, Union, cast
+from typing import List, Optional, Tuple, Union
 
 import pygame
 
+from autoplay import AutoPlayer, Player
+from engine import (
+    COLORS,
+    CYAN,
+    GREEN,
+    GRID_HEIGHT,
+    GRID_WIDTH,
+    ROTATIONS,
+    TICK_RATE,
+    Placement,
+    TetrisEngine,
+    Tetromino,
+)
+from planner import BeamPlanner
 from puzzle import Puzzle, load_puzzle_from_file
+from randomizer import GENERATORS, make_generator
+from render import BlockAtlas, Color, TextBlock, get_font, render_text
 
 # Initialize Pygame
 pygame.init()
@@ -13,32 +29,13 @@ pygame.font.init()  # Initialize the font module
 
 # Constants
 BLOCK_SIZE = 30
-GRID_WIDTH = 10
-GRID_HEIGHT = 20
 SCREEN_WIDTH = BLOCK_SIZE * (GRID_WIDTH + 6)  # Extra space for next piece preview
 SCREEN_HEIGHT = BLOCK_SIZE * GRID_HEIGHT
 
-# Scoring constants
-SOFT_DROP_SCORE = 1  # Points per cell for soft drop
-HARD_DROP_SCORE = 2  # Points per cell for hard drop
-
-# Level constants
-LINES_PER_LEVEL = 10  # Number of lines needed to advance to next level
-BASE_FALL_SPEED = 2.0  # Starting fall speed in seconds (slower start)
-SPEED_DECREASE = 0.2  # How much to decrease fall speed per level (more gradual)
-MIN_FALL_SPEED = 0.15  # Minimum fall speed (maximum difficulty, slightly more forgiving)
-
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 DARK_GRAY = (30, 30, 30)  # Subtle grid color
-CYAN = (0, 240, 240)  # Slightly softer colors
-BLUE = (0, 0, 240)
-ORANGE = (240, 160, 0)
-YELLOW = (240, 240, 0)
-GREEN = (0, 240, 0)
-PURPLE = (160, 0, 240)
-RED = (240, 0, 0)
 
 # Shadow colors - 40% opacity (increased from 25%)
 SHADOW_COLORS = [
@@ -51,521 +48,528 @@ SHADOW_COLORS = [
     (240, 0, 0, 102),  # RED
 ]
 
-# Tetromino shapes
-SHAPES = [
-    [[1, 1, 1, 1]],  # I
-    [[1, 0, 0], [1, 1, 1]],  # J
-    [[0, 0, 1], [1, 1, 1]],  # L
-    [[1, 1], [1, 1]],  # O
-    [[0, 1, 1], [1, 1, 0]],  # S
-    [[0, 1, 0], [1, 1, 1]],  # T
-    [[1, 1, 0], [0, 1, 1]],  # Z
-]
+# Screen regions used for dirty rectangle updates
+BOARD_RECT = pygame.Rect(0, 0, GRID_WIDTH * BLOCK_SIZE, GRID_HEIGHT * BLOCK_SIZE)
+PREVIEW_RECT = pygame.Rect(
+    GRID_WIDTH * BLOCK_SIZE + BLOCK_SIZE, BLOCK_SIZE * 2, 4 * BLOCK_SIZE, 4 * BLOCK_SIZE
+)
+# Sidebar text area, with a 10px margin on either side
+SIDEBAR_X = GRID_WIDTH * BLOCK_SIZE + 10
+SIDEBAR_WIDTH = SCREEN_WIDTH - SIDEBAR_X - 10
+
+# Menu list layout: entries are wrapped to fit between the left margin and the
+# scroll indicators, and the list stops above the instructions at the bottom
+MENU_TEXT_WIDTH = SCREEN_WIDTH - 100
+MENU_DESCRIPTION_LINE_HEIGHT = 27
+MENU_ITEM_GAP = 3
+MENU_LIST_BOTTOM = SCREEN_HEIGHT - 50
+
+HUD_RECT = pygame.Rect(
+    GRID_WIDTH * BLOCK_SIZE,
+    BLOCK_SIZE * 7,
+    SCREEN_WIDTH - GRID_WIDTH * BLOCK_SIZE,
+    SCREEN_HEIGHT - BLOCK_SIZE * 7,
+)
+
+
+# Most engine ticks to run in one go after a stall past the loop's scheduled
+# wake-up; beyond this the game pauses rather than fast-forwarding through
+# seconds of gravity at once
+MAX_CATCH_UP_TICKS = TICK_RATE // 4
+
+# Engine ticks between the moves the autoplayer makes in demo mode
+DEMO_MOVE_TICKS = 4
+
+
+def set_display_mode(vsync: bool = False) -> pygame.Surface:
+    """Open the game window. Vsync needs a renderer-backed (SCALED) display."""
+    if vsync:
+        return pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED, vsync=1)
+    return pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+
+def wait_for_events(timeout: Optional[int] = None) -> List[pygame.event.Event]:
+    """Sleep until an event arrives or timeout milliseconds pass, then return
+    every pending event. With no timeout, waits indefinitely."""
+    if timeout is not None and timeout <= 0:
+        return pygame.event.get()
+    event = pygame.event.wait() if timeout is None else pygame.event.wait(timeout)
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
 
-COLORS = [CYAN, BLUE, ORANGE, YELLOW, GREEN, PURPLE, RED]
-
-
-class Tetromino:
-    def __init__(self) -> None:
-        self.shapes: dict[str, list[list[int]]] = {
-            "I": [[1, 1, 1, 1]],
-            "O": [[1, 1], [1, 1]],
-            "T": [[0, 1, 0], [1, 1, 1]],
-            "S": [[0, 1, 1], [1, 1, 0]],
-            "Z": [[1, 1, 0], [0, 1, 1]],
-            "J": [[1, 0, 0], [1, 1, 1]],
-            "L": [[0, 0, 1], [1, 1, 1]],
-        }
-        self.colors: dict[str, str] = {
-            "I": "CYAN",
-            "O": "YELLOW",
-            "T": "PURPLE",
-            "S": "GREEN",
-            "Z": "RED",
-            "J": "BLUE",
-            "L": "ORANGE",
-        }
-        self.shape_type = random.choice(list(self.shapes.keys()))
-        self.shape: list[list[int]] = self.shapes[self.shape_type]
-        self.color = COLORS[["I", "J", "L", "O", "S", "T", "Z"].index(self.shape_type)]
-        self.x = GRID_WIDTH // 2 - len(self.shape[0]) // 2
-        self.y = 0
-        self.shape_idx = ["I", "J", "L", "O", "S", "T", "Z"].index(self.shape_type)
-
-    def rotate(self) -> None:
-        # Convert the shape to a list of tuples for rotation
-        rotated = list(zip(*self.shape[::-1]))
-        # Convert back to list of lists
-        self.shape = [list(row) for row in rotated]
+def is_expose_event(event: pygame.event.Event) -> bool:
+    """Check if the window contents were lost and need repainting."""
+    return event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
 
 
 class TetrisGame:
-    def __init__(self, puzzle: Optional[Puzzle] = None) -> None:
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    """Pygame front end that draws a TetrisEngine and feeds it keyboard input.
+
+    With ``dirty_rects`` set, only the parts of the screen that changed since
+    the last frame are pushed to the display instead of flipping all of it.
+
+    Game logic runs in fixed engine ticks driven by an accumulator, separately
+    from rendering. ``render_fps`` caps the frame rate (None for uncapped) and
+    ``vsync`` syncs frames to the display. With ``interpolate`` set, the falling
+    piece is drawn between rows according to how far it is through its fall
+    interval, which means rendering every frame instead of only on changes.
+
+    ``randomizer`` names the piece generator (see ``randomizer.GENERATORS``)
+    and ``seed`` seeds it, so a given seed deals the same pieces every game.
+
+    Given an ``autoplayer``, the game runs as a demo: the autoplayer plays
+    every piece, one move every DEMO_MOVE_TICKS ticks, and only pause and quit
+    are taken from the keyboard. ``preview_count`` sets how many upcoming
+    pieces the engine deals ahead, which planners can look through.
+
+    In puzzle mode, H outlines where the beam search planner would put the
+    current piece.
+    """
+
+    def __init__(
+        self,
+        puzzle: Optional[Puzzle] = None,
+        dirty_rects: bool = False,
+        render_fps: Optional[int] = 60,
+        vsync: bool = False,
+        interpolate: bool = False,
+        seed: Optional[int] = None,
+        randomizer: str = "uniform",
+        autoplayer: Optional[Player] = None,
+        preview_count: int = 1,
+    ) -> None:
+        self.screen = set_display_mode(vsync)
         pygame.display.set_caption("Tetris")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 28)  # Smaller font for longer text
-        # Change grid type to store color tuples instead of strings
-        self.grid: List[List[Optional[tuple[int, int, int]]]] = [
-            [None for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)
-        ]
-        self.current_piece: Optional[Tetromino] = None
-        self.next_piece = Tetromino()  # Initialize with a piece
-        self.score = 0
-        self.level = 1
-        self.lines_cleared = 0
-        self.game_over = False
+        self.font = get_font(36)
+        self.small_font = get_font(28)  # Smaller font for longer text
+        self.engine = TetrisEngine(
+            puzzle, generator=make_generator(randomizer, seed), preview_count=preview_count
+        )
         self.paused = False
-        self.pieces_used = 0
+        # The puzzle name is wrapped to fit the sidebar once, not every frame
+        self.puzzle_name = TextBlock(self.font, puzzle.name, SIDEBAR_WIDTH) if puzzle else None
         self.width = SCREEN_WIDTH
         self.height = SCREEN_HEIGHT
-        self.fall_speed = BASE_FALL_SPEED
-        self.puzzle = puzzle
-        self.is_puzzle_mode = puzzle is not None
-        if self.is_puzzle_mode:
-            self.load_puzzle_grid()
-
-        # Create a surface for shadow pieces with alpha channel
-        self.shadow_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-
-        # Initialize the first piece
-        self.current_piece = self.next_piece
-        self.next_piece = Tetromino()
-
-        # Check if game is blocked from the start
-        if self.check_blockout(self.current_piece):
-            self.game_over = True
-
-    def load_puzzle_grid(self) -> None:
-        """Load the initial grid state from puzzle data."""
-        if not self.puzzle:
-            return
 
-        color_map = {
-            "CYAN": CYAN,
-            "BLUE": BLUE,
-            "ORANGE": ORANGE,
-            "YELLOW": YELLOW,
-            "GREEN": GREEN,
-            "PURPLE": PURPLE,
-            "RED": RED,
-        }
-        for y, row in enumerate(self.puzzle.grid_data):
-            for x, cell in enumerate(row):
-                if cell is not None:
-                    color_name = cell.upper()
-                    if color_name in color_map:
-                        self.grid[y][x] = color_map[color_name]
-
-    def update_puzzle_goals(self) -> None:
-        """Update progress on puzzle goals."""
-        if not self.is_puzzle_mode or not self.puzzle:
-            return
+        # Everything that never changes is drawn once and blitted each frame
+        self.background = self.build_background()
+        self.atlas = BlockAtlas(COLORS, SHADOW_COLORS, BLOCK_SIZE)
+
+        # Locked blocks only change when a piece locks, so they live on their
+        # own layer that is patched from the engine's lock hook
+        self.settled_layer = pygame.Surface(
+            (GRID_WIDTH * BLOCK_SIZE, GRID_HEIGHT * BLOCK_SIZE)
+        ).convert()
+        self.settled_layer.set_colorkey(BLACK)
+        self.rebuild_settled_layer()
+        self.engine.on_lock = self.on_piece_locked
+
+        # Dirty rectangle bookkeeping: areas invalidated by locks, the piece and
+        # ghost rects drawn last frame, and the preview/HUD content last drawn
+        self.dirty_rects = dirty_rects
+        self.full_redraw = True
+        self.pending_rects: List[pygame.Rect] = []
+        self.moving_rects: List[pygame.Rect] = []
+        self.drawn_next_piece: Optional[Tetromino] = None
+        self.drawn_hud: Tuple[int, ...] = ()
+
+        self.render_fps = render_fps
+        self.interpolate = interpolate
+        # Pixels the current piece is drawn below its row when interpolating
+        self.fall_offset = 0
+
+        self.autoplayer = autoplayer
+        self.demo_piece: Optional[Tetromino] = None  # Piece demo_moves were planned for
+        self.demo_moves: List[str] = []
+        self.demo_countdown = DEMO_MOVE_TICKS
+
+        self.hint_planner = BeamPlanner() if puzzle else None
+        self.hint: Optional[Placement] = None
+        self.hint_piece: Optional[Tetromino] = None  # Piece the hint was found for
+
+    def build_background(self) -> pygame.Surface:
+        """Render the static parts of the screen: grid lines and the next piece box."""
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        background.fill(BLACK)
 
-        puzzle = self.puzzle  # Local variable to help type checker
-        for goal in puzzle.goals:
-            if goal.goal_type == "clear_lines":
-                goal.update(self.lines_cleared)
-            elif goal.goal_type == "max_pieces":
-                # For max_pieces, we check if we're still under the limit
-                goal.update(self.pieces_used)
-                if goal.current_value > goal.target_value:
-                    self.game_over = True
-            elif goal.goal_type == "score":
-                goal.update(self.score)
-            elif goal.goal_type == "pattern":
-                # Check if the pattern matches at the specified location
-                goal_any = cast(Any, goal)  # Cast to Any to access pattern attributes
-                pattern = goal_any.pattern
-                pattern_x = goal_any.pattern_x
-                pattern_y = goal_any.pattern_y
-                matches = 0
-
-                for y in range(len(pattern)):
-                    for x in range(len(pattern[0])):
-                        grid_y = pattern_y + y
-                        grid_x = pattern_x + x
-
-                        if pattern[y][x] is not None:
-                            if (
-                                grid_y < 0
-                                or grid_y >= GRID_HEIGHT
-                                or grid_x < 0
-                                or grid_x >= GRID_WIDTH
-                            ):
-                                continue
-
-                            color_name = None
-                            if self.grid[grid_y][grid_x] == CYAN:
-                                color_name = "CYAN"
-                            elif self.grid[grid_y][grid_x] == BLUE:
-                                color_name = "BLUE"
-                            elif self.grid[grid_y][grid_x] == ORANGE:
-                                color_name = "ORANGE"
-                            elif self.grid[grid_y][grid_x] == YELLOW:
-                                color_name = "YELLOW"
-                            elif self.grid[grid_y][grid_x] == GREEN:
-                                color_name = "GREEN"
-                            elif self.grid[grid_y][grid_x] == PURPLE:
-                                color_name = "PURPLE"
-                            elif self.grid[grid_y][grid_x] == RED:
-                                color_name = "RED"
-
-                            if color_name == pattern[y][x]:
-                                matches += 1
-
-                goal.update(matches)
-
-        # Check if all goals are achieved
-        # Use a separate check for puzzle completion to help type checker
-        if puzzle and puzzle.is_completed():
-            self.game_over = True
-
-    def check_blockout(self, piece: Optional[Tetromino]) -> bool:
-        """Check if a piece can be placed at its starting position."""
-        if not piece:
-            return False
-        for y, row in enumerate(piece.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    new_x = piece.x + x
-                    new_y = piece.y + y
-                    # Check if the position is already occupied
-                    if new_y >= 0 and (
-                        new_y >= GRID_HEIGHT
-                        or new_x < 0
-                        or new_x >= GRID_WIDTH
-                        or self.grid[new_y][new_x] is not None
-                    ):
-                        return True
-        return False
-
-    def add_drop_score(self, distance: int, is_hard_drop: bool = False) -> None:
-        """Add score for dropping pieces. Hard drops score more than soft drops."""
-        if is_hard_drop:
-            self.score += distance * HARD_DROP_SCORE
-        else:
-            self.score += distance * SOFT_DROP_SCORE
-
-    def draw_grid(self) -> None:
-        # Draw the game grid
         for y in range(GRID_HEIGHT):
             for x in range(GRID_WIDTH):
                 pygame.draw.rect(
-                    self.screen,
+                    background,
                     DARK_GRAY,  # Changed from WHITE to DARK_GRAY
                     (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE),
                     1,
                 )
-                cell_color = self.grid[y][x]
-                if cell_color is not None:
-                    pygame.draw.rect(
-                        self.screen,
-                        cell_color,
-                        (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE - 1, BLOCK_SIZE - 1),
-                    )
-
-    def draw_current_piece(self) -> None:
-        if self.current_piece:
-            for y, row in enumerate(self.current_piece.shape):
-                for x, cell in enumerate(row):
-                    if cell:
-                        pygame.draw.rect(
-                            self.screen,
-                            self.current_piece.color,
-                            (
-                                (self.current_piece.x + x) * BLOCK_SIZE,
-                                (self.current_piece.y + y) * BLOCK_SIZE,
-                                BLOCK_SIZE - 1,
-                                BLOCK_SIZE - 1,
-                            ),
-                        )
-
-    def draw_next_piece(self) -> None:
-        """Draw next piece preview."""
-        if not self.next_piece:
-            return
 
         next_piece_x = GRID_WIDTH * BLOCK_SIZE + BLOCK_SIZE
         next_piece_y = BLOCK_SIZE * 2
 
         # Draw "Next:" label
-        next_label = self.font.render("Next:", True, WHITE)
-        self.screen.blit(next_label, (next_piece_x, BLOCK_SIZE))
+        next_label = render_text(self.font, "Next:", WHITE)
+        background.blit(next_label, (next_piece_x, BLOCK_SIZE))
 
         # Draw preview box
         pygame.draw.rect(
-            self.screen,
+            background,
             DARK_GRAY,  # Match the grid color
             (next_piece_x, next_piece_y, 4 * BLOCK_SIZE, 4 * BLOCK_SIZE),
             1,
         )
+        return background
+
+    def rebuild_settled_layer(self) -> None:
+        """Redraw every locked block onto the settled layer."""
+        self.settled_layer.fill(BLACK)
+        blocks = self.atlas.blocks
+        colors = self.engine.board.colors
+        self.settled_layer.blits(
+            [
+                (
+                    blocks[color_idx - 1],
+                    ((i % GRID_WIDTH) * BLOCK_SIZE, (i // GRID_WIDTH) * BLOCK_SIZE),
+                )
+                for i, color_idx in enumerate(colors)
+                if color_idx
+            ],
+            doreturn=False,
+        )
+
+    def on_piece_locked(self, piece: Tetromino, cleared_rows: List[int]) -> None:
+        """Update the settled layer after the engine locks a piece."""
+        if cleared_rows:
+            # Rows above the cleared ones have moved, so redraw from the board
+            self.rebuild_settled_layer()
+            self.pending_rects.append(BOARD_RECT)
+            return
+        self.pending_rects.append(self.piece_rect(piece, piece.y))
+        self.draw_piece_blocks(
+            self.settled_layer,
+            self.atlas.blocks[piece.shape_idx],
+            piece,
+            piece.x * BLOCK_SIZE,
+            piece.y * BLOCK_SIZE,
+        )
+
+    def draw_piece_blocks(
+        self, target: pygame.Surface, block: pygame.Surface, piece: Tetromino, left: int, top: int
+    ) -> None:
+        """Blit one block per cell of a piece whose bounding box starts at (left, top)."""
+        target.blits(
+            [(block, (left + x * BLOCK_SIZE, top + y * BLOCK_SIZE)) for x, y in piece.state.cells],
+            doreturn=False,
+        )
+
+    def draw_grid(self) -> None:
+        # Locked blocks are kept up to date on their own layer
+        self.screen.blit(self.settled_layer, (0, 0))
+
+    def draw_current_piece(self) -> None:
+        piece = self.engine.current_piece
+        if piece:
+            self.draw_piece_blocks(
+                self.screen,
+                self.atlas.blocks[piece.shape_idx],
+                piece,
+                piece.x * BLOCK_SIZE,
+                piece.y * BLOCK_SIZE + self.fall_offset,
+            )
+
+    def draw_next_piece(self) -> None:
+        """Draw next piece preview."""
+        next_piece = self.engine.next_piece
+        if not next_piece:
+            return
+
+        next_piece_x = GRID_WIDTH * BLOCK_SIZE + BLOCK_SIZE
+        next_piece_y = BLOCK_SIZE * 2
 
         # Center the piece in the preview box
-        piece_width = len(self.next_piece.shape[0]) * BLOCK_SIZE
-        piece_height = len(self.next_piece.shape) * BLOCK_SIZE
+        piece_width = len(next_piece.shape[0]) * BLOCK_SIZE
+        piece_height = len(next_piece.shape) * BLOCK_SIZE
         center_x = next_piece_x + (4 * BLOCK_SIZE - piece_width) // 2
         center_y = next_piece_y + (4 * BLOCK_SIZE - piece_height) // 2
 
         # Draw the next piece
-        for y, row in enumerate(self.next_piece.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    pygame.draw.rect(
-                        self.screen,
-                        self.next_piece.color,
-                        (
-                            center_x + x * BLOCK_SIZE,
-                            center_y + y * BLOCK_SIZE,
-                            BLOCK_SIZE - 1,
-                            BLOCK_SIZE - 1,
-                        ),
-                    )
-
-    def check_collision(self, x_offset: int = 0, y_offset: int = 0) -> bool:
-        if not self.current_piece:
-            return False
+        self.draw_piece_blocks(
+            self.screen, self.atlas.blocks[next_piece.shape_idx], next_piece, center_x, center_y
+        )
 
-        for y, row in enumerate(self.current_piece.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    new_x = self.current_piece.x + x + x_offset
-                    new_y = self.current_piece.y + y + y_offset
-                    if (
-                        new_x < 0
-                        or new_x >= GRID_WIDTH
-                        or new_y >= GRID_HEIGHT
-                        or (new_y >= 0 and self.grid[new_y][new_x] is not None)
-                    ):
-                        return True
-        return False
-
-    def lock_piece(self) -> None:
-        if not self.current_piece:
-            return
-        for y, row in enumerate(self.current_piece.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    if self.current_piece.y + y < 0:
-                        self.game_over = True
-                        return
-                    self.grid[self.current_piece.y + y][
-                        self.current_piece.x + x
-                    ] = self.current_piece.color
-
-        self.pieces_used += 1  # Increment pieces used counter
-        self.clear_lines()
-        self.current_piece = self.next_piece
-        self.next_piece = Tetromino()
-
-        # Check if the new piece can be placed
-        if self.check_blockout(self.current_piece):
-            self.game_over = True
-
-        if self.is_puzzle_mode:
-            self.update_puzzle_goals()
-
-    def update_level(self) -> None:
-        """Update level based on lines cleared and adjust fall speed."""
-        new_level = (self.lines_cleared // LINES_PER_LEVEL) + 1
-        if new_level != self.level:
-            self.level = new_level
-            # Calculate new fall speed with a minimum limit
-            self.fall_speed = max(
-                MIN_FALL_SPEED, BASE_FALL_SPEED - (SPEED_DECREASE * (self.level - 1))
+    def draw_shadow(self) -> None:
+        """Draw the shadow of the current piece."""
+        piece = self.engine.current_piece
+        if piece:
+            shadow_y = self.engine.get_shadow_position()
+            self.screen.blit(
+                self.atlas.ghosts[piece.shape_idx][piece.rotation],
+                (piece.x * BLOCK_SIZE, shadow_y * BLOCK_SIZE),
             )
 
-    def clear_lines(self) -> None:
-        lines_cleared = 0
-        y = GRID_HEIGHT - 1
-        while y >= 0:
-            if all(cell is not None for cell in self.grid[y]):
-                lines_cleared += 1
-                for y2 in range(y, 0, -1):
-                    self.grid[y2] = self.grid[y2 - 1][:]
-                self.grid[0] = [None] * GRID_WIDTH
-            else:
-                y -= 1
-
-        # Update score and level
-        if lines_cleared > 0:
-            self.score += (100 * lines_cleared) * lines_cleared  # Bonus for multiple lines
-            self.lines_cleared += lines_cleared
-            self.update_level()
-
-            # Check puzzle goals after clearing lines
-            if self.is_puzzle_mode:
-                self.update_puzzle_goals()
-                if self.puzzle.is_completed():  # type: ignore
-                    self.game_over = True
-
-    def get_shadow_position(self) -> int:
-        """Calculate the lowest possible position for the current piece."""
-        if not self.current_piece:
-            return 0
-
-        shadow_y = self.current_piece.y
-        while not self.check_collision(y_offset=shadow_y - self.current_piece.y + 1):
-            shadow_y += 1
-        return shadow_y
+    def show_hint(self) -> bool:
+        """Plan a placement for the current piece to show as a hint. Returns
+        True if there is one to show."""
+        engine = self.engine
+        if not self.hint_planner or not engine.current_piece:
+            return False
+        self.hint = self.hint_planner.choose(engine)
+        self.hint_piece = engine.current_piece
+        return self.hint is not None
+
+    def current_hint(self) -> Optional[Placement]:
+        """The hint for the current piece, if one was asked for."""
+        if self.hint_piece is None or self.hint_piece is not self.engine.current_piece:
+            return None
+        return self.hint
+
+    def hint_cells(self, piece: Tetromino, hint: Placement) -> List[Tuple[int, int]]:
+        """Grid cells the piece covers in the hinted placement."""
+        return [
+            (hint.x + x, hint.y + y) for x, y in ROTATIONS[piece.shape_idx][hint.rotation].cells
+        ]
 
-    def draw_shadow(self) -> None:
-        """Draw the shadow of the current piece."""
-        if self.current_piece:
-            shadow_y = self.get_shadow_position()
-
-            # Clear the shadow surface
-            self.shadow_surface.fill((0, 0, 0, 0))
-
-            # Draw the shadow piece
-            for y, row in enumerate(self.current_piece.shape):
-                for x, cell in enumerate(row):
-                    if cell:
-                        shadow_color = SHADOW_COLORS[self.current_piece.shape_idx]
-                        pygame.draw.rect(
-                            self.shadow_surface,
-                            shadow_color,
-                            (
-                                (self.current_piece.x + x) * BLOCK_SIZE,
-                                (shadow_y + y) * BLOCK_SIZE,
-                                BLOCK_SIZE - 1,
-                                BLOCK_SIZE - 1,
-                            ),
-                        )
-
-            # Blit the shadow surface onto the main screen
-            self.screen.blit(self.shadow_surface, (0, 0))
+    def draw_hint(self) -> None:
+        """Outline the cells of the hinted placement."""
+        hint = self.current_hint()
+        piece = self.engine.current_piece
+        if not hint or not piece:
+            return
+        for x, y in self.hint_cells(piece, hint):
+            pygame.draw.rect(
+                self.screen, WHITE, (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE), 2
+            )
 
     def draw_puzzle_info(self) -> None:
         """Draw puzzle information and goals."""
-        if not self.is_puzzle_mode or not self.puzzle:
+        puzzle = self.engine.puzzle
+        if not puzzle or not self.puzzle_name:
             return
 
         y_pos = BLOCK_SIZE * 7  # Start higher up
-        sidebar_x = GRID_WIDTH * BLOCK_SIZE + 10
-        sidebar_width = SCREEN_WIDTH - sidebar_x - 10  # Leave 10px margin
-
-        # Draw puzzle name (with word wrap if needed)
-        words = self.puzzle.name.split()
-        lines: List[str] = []
-        current_line: List[str] = []
-
-        for word in words:
-            test_line = " ".join(current_line + [word])
-            if self.font.size(test_line)[0] <= sidebar_width:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(" ".join(current_line))
-                current_line = [word]
-        if current_line:
-            lines.append(" ".join(current_line))
-
-        for line in lines:
-            name_surface = self.font.render(line, True, WHITE)
-            self.screen.blit(name_surface, (sidebar_x, y_pos))
-            y_pos += 30
+        sidebar_x = SIDEBAR_X
+
+        # Draw puzzle name (wrapped when the puzzle was loaded)
+        y_pos = self.puzzle_name.draw(self.screen, sidebar_x, y_pos, WHITE, 30)
 
         y_pos += 20  # Add some spacing
 
         # Draw pieces used
-        pieces_surface = self.font.render(f"Pieces: {self.pieces_used}", True, WHITE)
+        pieces_surface = render_text(self.font, f"Pieces: {self.engine.pieces_used}", WHITE)
         self.screen.blit(pieces_surface, (sidebar_x, y_pos))
         y_pos += 40
 
         # Draw goals
-        for goal in self.puzzle.goals:
+        for goal in puzzle.goals:
             color = GREEN if goal.is_achieved() else WHITE
             # Format goal type to be more readable
             goal_type = goal.goal_type.replace("_", " ").title()
-            goal_surface = self.small_font.render(
-                f"{goal_type}: {goal.current_value}/{goal.target_value}", True, color
+            goal_surface = render_text(
+                self.small_font, f"{goal_type}: {goal.current_value}/{goal.target_value}", color
             )
             self.screen.blit(goal_surface, (sidebar_x, y_pos))
             y_pos += 30
 
+    def piece_rect(self, piece: Tetromino, y: int) -> pygame.Rect:
+        """Screen rect covering a piece's bounding box with its top at row y."""
+        state = piece.state
+        return pygame.Rect(
+            piece.x * BLOCK_SIZE,
+            y * BLOCK_SIZE,
+            state.width * BLOCK_SIZE,
+            state.height * BLOCK_SIZE,
+        )
+
+    def hud_state(self) -> Tuple[int, ...]:
+        """Values shown in the sidebar, used to tell when it needs redrawing."""
+        engine = self.engine
+        values = [engine.score, engine.level, engine.lines_cleared, engine.pieces_used]
+        if engine.puzzle:
+            values += [goal.current_value for goal in engine.puzzle.goals]
+        return tuple(values)
+
+    def collect_dirty_rects(self) -> List[pygame.Rect]:
+        """Return the screen areas that may differ from the previous frame."""
+        engine = self.engine
+        moving = []
+        piece = engine.current_piece
+        if piece:
+            moving.append(self.piece_rect(piece, piece.y).move(0, self.fall_offset))
+            moving.append(self.piece_rect(piece, engine.get_shadow_position()))
+        hint = self.current_hint()
+        if hint and piece:
+            moving.extend(
+                pygame.Rect(x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE)
+                for x, y in self.hint_cells(piece, hint)
+            )
+
+        # Where the piece and ghost were last frame must be repainted too
+        rects = self.pending_rects + self.moving_rects + moving
+        self.pending_rects = []
+        self.moving_rects = moving
+
+        if engine.next_piece is not self.drawn_next_piece:
+            self.drawn_next_piece = engine.next_piece
+            rects.append(PREVIEW_RECT)
+        hud = self.hud_state()
+        if hud != self.drawn_hud:
+            self.drawn_hud = hud
+            rects.append(HUD_RECT)
+        return rects
+
+    def update_fall_offset(self, tick_fraction: float) -> None:
+        """Work out how far below its row to draw the current piece.
+
+        tick_fraction is how far the accumulator is into the next engine tick.
+        """
+        engine = self.engine
+        piece = engine.current_piece
+        self.fall_offset = 0
+        if not self.interpolate or not piece or engine.check_collision(y_offset=1):
+            return
+        progress = (engine.gravity_ticks + tick_fraction) / engine.gravity_interval
+        self.fall_offset = min(BLOCK_SIZE - 1, int(progress * BLOCK_SIZE))
+
+    def draw(self) -> None:
+        """Draw a complete frame to the screen surface."""
+        engine = self.engine
+        self.screen.blit(self.background, (0, 0))
+        self.draw_grid()
+        self.draw_shadow()
+        self.draw_hint()
+        self.draw_current_piece()
+        self.draw_next_piece()
+
+        # Draw score and level (if not in puzzle mode)
+        if not engine.is_puzzle_mode:
+            score_text = render_text(self.font, f"Score: {engine.score}", WHITE)
+            level_text = render_text(self.font, f"Level: {engine.level}", WHITE)
+            lines_text = render_text(self.font, f"Lines: {engine.lines_cleared}", WHITE)
+
+            self.screen.blit(score_text, (GRID_WIDTH * BLOCK_SIZE + 10, BLOCK_SIZE * 7))
+            self.screen.blit(level_text, (GRID_WIDTH * BLOCK_SIZE + 10, BLOCK_SIZE * 8))
+            self.screen.blit(lines_text, (GRID_WIDTH * BLOCK_SIZE + 10, BLOCK_SIZE * 9))
+        else:
+            self.draw_puzzle_info()
+
+    def present(self) -> None:
+        """Push the drawn frame to the display."""
+        if not self.dirty_rects:
+            pygame.display.flip()
+            return
+
+        rects = self.collect_dirty_rects()
+        if self.full_redraw:
+            self.full_redraw = False
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    def demo_tick(self) -> bool:
+        """Advance the autoplayer by one engine tick, making its next move when
+        one is due. Returns True if the game state changed."""
+        self.demo_countdown -= 1
+        if self.demo_countdown > 0 or not self.autoplayer:
+            return False
+        self.demo_countdown = DEMO_MOVE_TICKS
+
+        engine = self.engine
+        if engine.current_piece is not self.demo_piece:
+            self.demo_piece = engine.current_piece
+            placement = self.autoplayer.choose(engine)
+            self.demo_moves = list(placement.moves) if placement else []
+        if not self.demo_moves:
+            return False
+        if not engine.step(self.demo_moves.pop(0)):
+            # Gravity got in the way of the plan; make a new one from here
+            self.demo_piece = None
+            return False
+        return True
+
     def run(self) -> None:
-        last_fall_time = pygame.time.get_ticks()
+        engine = self.engine
+        tick_ms = 1000 / TICK_RATE
+        accumulator = 0.0  # Milliseconds of game time not yet simulated
+        last_time = pygame.time.get_ticks()
+        needs_redraw = True
+
+        while not engine.game_over:
+            # Sleep until there is input or the next gravity step is due. While
+            # paused nothing happens without input, so wait indefinitely.
+            # Interpolated rendering draws every frame, so only poll.
+            timeout: Optional[int] = None
+            if not self.paused:
+                if self.interpolate:
+                    timeout = 0
+                else:
+                    ticks = engine.ticks_until_gravity()
+                    if self.autoplayer:
+                        ticks = min(ticks, self.demo_countdown)
+                    timeout = int(ticks * tick_ms - accumulator) + 1
+            events = wait_for_events(timeout)
 
-        while not self.game_over:
             current_time = pygame.time.get_ticks()
-            delta_time = (current_time - last_fall_time) / 1000.0  # Convert to seconds
+            if not self.paused:
+                accumulator += current_time - last_time
+            last_time = current_time
 
-            for event in pygame.event.get():
+            for event in events:
                 if event.type == pygame.QUIT:
                     return  # Return to menu instead of quitting
 
+                if is_expose_event(event):
+                    needs_redraw = True
+                    self.full_redraw = True
+
                 if event.type == pygame.KEYDOWN:
-                    if not self.paused and self.current_piece:
+                    if not self.paused and not self.autoplayer:
                         if event.key == pygame.K_LEFT:
-                            if not self.check_collision(x_offset=-1):
-                                self.current_piece.x -= 1
+                            needs_redraw |= engine.step("left")
                         elif event.key == pygame.K_RIGHT:
-                            if not self.check_collision(x_offset=1):
-                                self.current_piece.x += 1
+                            needs_redraw |= engine.step("right")
                         elif event.key == pygame.K_DOWN:
-                            if not self.check_collision(y_offset=1):
-                                start_y = self.current_piece.y
-                                self.current_piece.y += 1
-                                self.add_drop_score(1)  # Score for each cell dropped
+                            needs_redraw |= engine.step("soft_drop")
                         elif event.key == pygame.K_UP:
-                            original_shape = self.current_piece.shape[:]
-                            self.current_piece.rotate()
-                            if self.check_collision():
-                                self.current_piece.shape = original_shape
+                            needs_redraw |= engine.step("rotate")
                         elif event.key == pygame.K_SPACE:
-                            start_y = self.current_piece.y
-                            while not self.check_collision(y_offset=1):
-                                self.current_piece.y += 1
-                            drop_distance = self.current_piece.y - start_y
-                            self.add_drop_score(drop_distance, is_hard_drop=True)
-                            self.lock_piece()
-                            last_fall_time = current_time
+                            needs_redraw |= engine.step("hard_drop")
 
                     if event.key == pygame.K_p:
                         self.paused = not self.paused
+                        needs_redraw = True
+                    elif event.key == pygame.K_h and not self.paused:
+                        needs_redraw |= self.show_hint()
                     elif event.key == pygame.K_q:
                         return  # Return to menu instead of quitting
 
-            if not self.paused and self.current_piece:
-                if delta_time > self.fall_speed:
-                    if not self.check_collision(y_offset=1):
-                        self.current_piece.y += 1
-                    else:
-                        self.lock_piece()
-                    last_fall_time = current_time
-
-                # Draw everything
-                self.screen.fill(BLACK)
-                self.draw_grid()
-                self.draw_shadow()
-                self.draw_current_piece()
-                self.draw_next_piece()
-
-                # Draw score and level (if not in puzzle mode)
-                if not self.is_puzzle_mode:
-                    score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-                    level_text = self.font.render(f"Level: {self.level}", True, WHITE)
-                    lines_text = self.font.render(f"Lines: {self.lines_cleared}", True, WHITE)
-
-                    self.screen.blit(score_text, (GRID_WIDTH * BLOCK_SIZE + 10, BLOCK_SIZE * 7))
-                    self.screen.blit(level_text, (GRID_WIDTH * BLOCK_SIZE + 10, BLOCK_SIZE * 8))
-                    self.screen.blit(lines_text, (GRID_WIDTH * BLOCK_SIZE + 10, BLOCK_SIZE * 9))
-                else:
-                    self.draw_puzzle_info()
-
-                pygame.display.flip()
-                self.clock.tick(60)
+            # Run every engine tick that is due. After a slow frame this catches
+            # up rather than letting the game run slower. Time slept on purpose
+            # until a scheduled wake-up is never cut; only an overrun past it is.
+            limit = max(timeout or 0, 0) + MAX_CATCH_UP_TICKS * tick_ms
+            if accumulator > limit:
+                accumulator = limit
+            while accumulator >= tick_ms and not engine.game_over:
+                needs_redraw |= engine.tick()
+                if self.autoplayer:
+                    needs_redraw |= self.demo_tick()
+                accumulator -= tick_ms
+
+            if not self.paused and engine.current_piece:
+                # Only render when something on screen has changed
+                if needs_redraw or self.interpolate:
+                    needs_redraw = False
+                    self.update_fall_offset(accumulator / tick_ms)
+                    self.draw()
+                    self.present()
+                    if self.render_fps:
+                        self.clock.tick(self.render_fps)
 
         # Game over screen
         self.screen.fill(BLACK)
         result_text = (
-            "Puzzle Completed!"
-            if self.is_puzzle_mode and self.puzzle and self.puzzle.is_completed()
-            else "Game Over!"
+            "Puzzle Completed!" if engine.puzzle and engine.puzzle.is_completed() else "Game Over!"
         )
-        game_over_surface = self.font.render(result_text, True, WHITE)
+        game_over_surface = render_text(self.font, result_text, WHITE)
         game_over_rect = game_over_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
         self.screen.blit(game_over_surface, game_over_rect)
         pygame.display.flip()
@@ -579,23 +583,26 @@ class Menu:
         self.screen = screen
         self.state = "main"  # main, instructions
         self.selected_option = 0
-        self.main_options = ["Play Game", "Puzzle Mode", "Instructions", "Quit"]
-        self.font = pygame.font.Font(None, 48)
-        self.small_font = pygame.font.Font(None, 36)
+        self.main_options = ["Play Game", "Puzzle Mode", "Demo", "Instructions", "Quit"]
+        self.font = get_font(48)
+        self.small_font = get_font(36)
+        # Menus only redraw after input changes something
+        self.needs_redraw = True
 
     def draw(self) -> None:
+        self.needs_redraw = False
         self.screen.fill(BLACK)
 
         if self.state == "main":
             # Draw title
-            title_surface = self.font.render("TETRIS", True, WHITE)
+            title_surface = render_text(self.font, "TETRIS", WHITE)
             title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4))
             self.screen.blit(title_surface, title_rect)
 
             # Draw menu options
             for i, option in enumerate(self.main_options):
                 color = CYAN if i == self.selected_option else WHITE
-                text_surface = self.font.render(option, True, color)
+                text_surface = render_text(self.font, option, color)
                 rect = text_surface.get_rect(
                     center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + i * 60)
                 )
@@ -610,23 +617,28 @@ class Menu:
                 "Down Arrow: Soft drop",
                 "Space: Hard drop",
                 "P: Pause game",
+                "H: Hint (puzzle mode)",
                 "Q: Quit to menu",
                 "",
                 "Press ESC to return to menu",
             ]
 
             for i, line in enumerate(instructions):
-                text_surface = self.small_font.render(line, True, WHITE)
+                text_surface = render_text(self.small_font, line, WHITE)
                 rect = text_surface.get_rect(left=50, top=50 + i * 40)
                 self.screen.blit(text_surface, rect)
 
         pygame.display.flip()
 
     def handle_input(self) -> Union[str, Tuple[str, Puzzle]]:
-        for event in pygame.event.get():
+        # Block until something happens; an idle menu needs no CPU
+        for event in wait_for_events():
             if event.type == pygame.QUIT:
                 return "quit"
 
+            if event.type == pygame.KEYDOWN or is_expose_event(event):
+                self.needs_redraw = True
+
             if event.type == pygame.KEYDOWN:
                 if self.state == "main":
                     if event.key == pygame.K_UP:
@@ -642,6 +654,8 @@ class Menu:
                             self.state = "instructions"
                         elif self.main_options[self.selected_option] == "Puzzle Mode":
                             return "puzzle"
+                        elif self.main_options[self.selected_option] == "Demo":
+                            return "demo"
 
                 elif self.state == "instructions":
                     if event.key == pygame.K_ESCAPE:
@@ -666,6 +680,42 @@ class PuzzleMenu(Menu):
         self.scroll_offset = 0
         self.max_visible = 8
         self.puzzles: List[Puzzle] = []  # Will be loaded when category is selected
+        # Names and descriptions are wrapped once, when their list is loaded
+        self.category_layouts = [self.layout_item(name, desc) for name, desc in self.categories]
+        self.puzzle_layouts: List[Tuple[TextBlock, TextBlock]] = []
+
+    def layout_item(self, name: str, description: str) -> Tuple[TextBlock, TextBlock]:
+        """Wrap a list entry's name and description to the menu width."""
+        return (
+            TextBlock(self.font, name, MENU_TEXT_WIDTH),
+            TextBlock(self.small_font, description, MENU_TEXT_WIDTH),
+        )
+
+    def draw_item(self, layout: Tuple[TextBlock, TextBlock], top: int, color: Color) -> int:
+        """Draw a list entry starting at top. Returns the top of the next entry."""
+        name, description = layout
+        y = name.draw(self.screen, 50, top, color, 30)
+        y = description.draw(self.screen, 50, y, color, MENU_DESCRIPTION_LINE_HEIGHT)
+        return y + MENU_ITEM_GAP
+
+    def item_height(self, layout: Tuple[TextBlock, TextBlock]) -> int:
+        name, description = layout
+        return (
+            len(name.lines) * 30
+            + len(description.lines) * MENU_DESCRIPTION_LINE_HEIGHT
+            + MENU_ITEM_GAP
+        )
+
+    def visible_count(self, offset: int) -> int:
+        """Number of puzzles that fit on screen when the list starts at offset."""
+        count = 0
+        y = 120
+        for layout in self.puzzle_layouts[offset : offset + self.max_visible]:
+            y += self.item_height(layout)
+            if y > MENU_LIST_BOTTOM and count:
+                break
+            count += 1
+        return count
 
     def load_puzzles_for_category(self, category_idx: int) -> List[Puzzle]:
         """Load puzzles for the selected category."""
@@ -686,88 +736,71 @@ class PuzzleMenu(Menu):
         return puzzles
 
     def draw(self) -> None:
+        self.needs_redraw = False
         self.screen.fill(BLACK)
 
         if self.state == "category_select":
             # Draw title
-            title_surface = self.font.render("Select Puzzle Type", True, WHITE)
+            title_surface = render_text(self.font, "Select Puzzle Type", WHITE)
             title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, 50))
             self.screen.blit(title_surface, title_rect)
 
             # Draw category list
-            start_y = 120
-            for i, (name, desc) in enumerate(self.categories):
+            y = 120
+            for i, layout in enumerate(self.category_layouts):
                 color = CYAN if i == self.selected_category else WHITE
-
-                # Draw category name
-                text_surface = self.font.render(name, True, color)
-                rect = text_surface.get_rect(left=50, top=start_y + i * 60)
-                self.screen.blit(text_surface, rect)
-
-                # Draw category description
-                desc_surface = self.small_font.render(desc, True, color)
-                desc_rect = desc_surface.get_rect(left=50, top=start_y + i * 60 + 30)
-                self.screen.blit(desc_surface, desc_rect)
+                y = self.draw_item(layout, y, color)
 
             # Draw instructions
-            back_surface = self.small_font.render("Press ESC to return to menu", True, WHITE)
+            back_surface = render_text(self.small_font, "Press ESC to return to menu", WHITE)
             back_rect = back_surface.get_rect(bottom=SCREEN_HEIGHT - 20, centerx=SCREEN_WIDTH // 2)
             self.screen.blit(back_surface, back_rect)
 
         elif self.state == "puzzle_select":
             # Draw title with category name
             category_name = self.categories[self.selected_category][0]
-            title_surface = self.font.render(f"Select {category_name}", True, WHITE)
+            title_surface = render_text(self.font, f"Select {category_name}", WHITE)
             title_rect = title_surface.get_rect(center=(SCREEN_WIDTH // 2, 50))
             self.screen.blit(title_surface, title_rect)
 
             if not self.puzzles:
                 # No puzzles available message
-                msg_surface = self.font.render("No puzzles available", True, WHITE)
+                msg_surface = render_text(self.font, "No puzzles available", WHITE)
                 msg_rect = msg_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
                 self.screen.blit(msg_surface, msg_rect)
             else:
                 # Draw puzzle list
-                start_y = 120
-                for i in range(min(self.max_visible, len(self.puzzles))):
-                    idx = i + self.scroll_offset
-                    if idx >= len(self.puzzles):
-                        break
-
-                    puzzle = self.puzzles[idx]
+                y = 120
+                visible = self.visible_count(self.scroll_offset)
+                for idx in range(self.scroll_offset, self.scroll_offset + visible):
                     color = CYAN if idx == self.selected_puzzle else WHITE
-
-                    # Draw puzzle name
-                    text_surface = self.font.render(puzzle.name, True, color)
-                    rect = text_surface.get_rect(left=50, top=start_y + i * 60)
-                    self.screen.blit(text_surface, rect)
-
-                    # Draw puzzle description
-                    desc_surface = self.small_font.render(puzzle.description, True, color)
-                    desc_rect = desc_surface.get_rect(left=50, top=start_y + i * 60 + 30)
-                    self.screen.blit(desc_surface, desc_rect)
+                    y = self.draw_item(self.puzzle_layouts[idx], y, color)
 
                 # Draw scroll indicators if needed
                 if self.scroll_offset > 0:
-                    up_surface = self.font.render("▲", True, WHITE)
+                    up_surface = render_text(self.font, "▲", WHITE)
                     self.screen.blit(up_surface, (SCREEN_WIDTH - 50, 100))
 
-                if self.scroll_offset + self.max_visible < len(self.puzzles):
-                    down_surface = self.font.render("▼", True, WHITE)
+                if self.scroll_offset + visible < len(self.puzzles):
+                    down_surface = render_text(self.font, "▼", WHITE)
                     self.screen.blit(down_surface, (SCREEN_WIDTH - 50, SCREEN_HEIGHT - 100))
 
             # Draw back instruction
-            back_surface = self.small_font.render("Press ESC to return to categories", True, WHITE)
+            back_surface = render_text(self.small_font, "Press ESC to return to categories", WHITE)
             back_rect = back_surface.get_rect(bottom=SCREEN_HEIGHT - 20, centerx=SCREEN_WIDTH // 2)
             self.screen.blit(back_surface, back_rect)
 
         pygame.display.flip()
 
     def handle_input(self) -> Union[str, Tuple[str, Puzzle]]:
-        for event in pygame.event.get():
+        # Block until something happens; an idle menu needs no CPU
+        for event in wait_for_events():
             if event.type == pygame.QUIT:
                 return "quit"
 
+            if event.type == pygame.KEYDOWN or is_expose_event(event):
+                self.needs_redraw = True
+
             if event.type == pygame.KEYDOWN:
                 if self.state == "category_select":
                     if event.key == pygame.K_UP:
@@ -776,6 +809,10 @@ class PuzzleMenu(Menu):
                         self.selected_category = (self.selected_category + 1) % len(self.categories)
                     elif event.key == pygame.K_RETURN:
                         self.puzzles = self.load_puzzles_for_category(self.selected_category)
+                        self.puzzle_layouts = [
+                            self.layout_item(puzzle.name, puzzle.description)
+                            for puzzle in self.puzzles
+                        ]
                         self.selected_puzzle = 0
                         self.scroll_offset = 0
                         self.state = "puzzle_select"
@@ -789,8 +826,11 @@ class PuzzleMenu(Menu):
                             self.scroll_offset = self.selected_puzzle
                     elif event.key == pygame.K_DOWN:
                         self.selected_puzzle = min(len(self.puzzles) - 1, self.selected_puzzle + 1)
-                        if self.selected_puzzle >= self.scroll_offset + self.max_visible:
-                            self.scroll_offset = self.selected_puzzle - self.max_visible + 1
+                        # Entries vary in height, so scroll until the selection fits
+                        while self.selected_puzzle >= self.scroll_offset + self.visible_count(
+                            self.scroll_offset
+                        ):
+                            self.scroll_offset += 1
                     elif event.key == pygame.K_RETURN and self.puzzles:
                         return ("puzzle_selected", self.puzzles[self.selected_puzzle])
                     elif event.key == pygame.K_ESCAPE:
@@ -800,33 +840,77 @@ class PuzzleMenu(Menu):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Tetris.")
+    parser.add_argument(
+        "--dirty-rects",
+        action="store_true",
+        help="update only changed screen areas (faster on software-rendered displays)",
+    )
+    parser.add_argument(
+        "--fps", type=int, default=60, help="maximum frames per second; 0 for uncapped"
+    )
+    parser.add_argument("--vsync", action="store_true", help="sync frames to the display")
+    parser.add_argument(
+        "--interpolate", action="store_true", help="draw the falling piece between rows"
+    )
+    parser.add_argument(
+        "--randomizer",
+        choices=sorted(GENERATORS),
+        default="uniform",
+        help="how the piece sequence is generated",
+    )
+    parser.add_argument("--seed", type=int, help="seed for a reproducible piece sequence")
+    parser.add_argument(
+        "--ai",
+        choices=["greedy", "beam"],
+        default="greedy",
+        help="player used by the demo: one-piece lookahead or beam search over the preview",
+    )
+    parser.add_argument(
+        "--preview", type=int, default=1, help="number of upcoming pieces dealt ahead"
+    )
+    args = parser.parse_args()
+    game_options = {
+        "dirty_rects": args.dirty_rects,
+        "render_fps": args.fps or None,
+        "vsync": args.vsync,
+        "interpolate": args.interpolate,
+        "seed": args.seed,
+        "randomizer": args.randomizer,
+        "preview_count": args.preview,
+    }
+
     pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    screen = set_display_mode(args.vsync)
     pygame.display.set_caption("Tetris")
-    clock = pygame.time.Clock()
 
     while True:
         menu = Menu(screen)
-        # Main menu loop
+        # Main menu loop; handle_input sleeps until there is input
         while True:
+            if menu.needs_redraw:
+                menu.draw()
             action = menu.handle_input()
-            menu.draw()
 
             if action == "quit":
                 pygame.quit()
                 sys.exit()
-            elif action == "play":
-                game = TetrisGame()
+            elif action in ("play", "demo"):
+                autoplayer: Optional[Player] = None
+                if action == "demo":
+                    autoplayer = BeamPlanner() if args.ai == "beam" else AutoPlayer()
+                game = TetrisGame(autoplayer=autoplayer, **game_options)
                 game.run()
                 break  # Return to menu after game ends
             elif action == "puzzle":
                 puzzle_menu = PuzzleMenu(screen)
                 while True:
+                    if puzzle_menu.needs_redraw:
+                        puzzle_menu.draw()
                     result = puzzle_menu.handle_input()
-                    puzzle_menu.draw()
 
                     if isinstance(result, tuple) and result[0] == "puzzle_selected":
-                        game = TetrisGame(puzzle=result[1])
+                        game = TetrisGame(puzzle=result[1], **game_options)
                         game.run()
                         break
                     elif result == "menu":
@@ -834,8 +918,4 @@ if __name__ == "__main__":
                     elif result == "quit":
                         pygame.quit()
                         sys.exit()
-
-                    clock.tick(60)
                 break
-
-            clock.tick(60)
@@ -0,0 +1,99 @@
+"""Bounded transposition table for searches over board positions.
+
+Keyed on 64-bit hashes such as :attr:`board.Board.zobrist`, combined with
+whatever else the search's positions depend on. The table never grows past the
+size it was made with: each key maps to one bucket of two entries, and storing
+into a full bucket replaces one of them.
+
+One entry in each bucket keeps the deepest result, so expensive results
+survive floods of shallow ones; it only gives way to a result at least as deep,
+or to anything once it is left over from an earlier search (see
+:meth:`TranspositionTable.new_search`). The other entry always takes the most
+recent result that didn't replace the first.
+"""
+
+from typing import Generic, List, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class Entry(Generic[V]):
+    """A stored result: ``value`` holds for searches up to ``depth`` deep."""
+
+    __slots__ = ("key", "depth", "value", "generation")
+
+    def __init__(self, key: int, depth: int, value: V, generation: int) -> None:
+        self.key = key
+        self.depth = depth
+        self.value = value
+        self.generation = generation
+
+
+class TranspositionTable(Generic[V]):
+    """Fixed-size hash table of search results.
+
+    ``size`` is the number of buckets, rounded up to a power of two; the table
+    holds at most twice that many entries.
+    """
+
+    def __init__(self, size: int = 1 << 16) -> None:
+        buckets = 1
+        while buckets < size:
+            buckets <<= 1
+        self.mask = buckets - 1
+        self.deep: List[Optional[Entry[V]]] = [None] * buckets
+        self.recent: List[Optional[Entry[V]]] = [None] * buckets
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self.deep) + sum(
+            entry is not None for entry in self.recent
+        )
+
+    def lookup(self, key: int) -> Optional[Entry[V]]:
+        """Return the entry stored for key, if it is still in the table."""
+        index = key & self.mask
+        entry = self.deep[index]
+        if entry is None or entry.key != key:
+            entry = self.recent[index]
+            if entry is None or entry.key != key:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry
+
+    def get(self, key: int, depth: int = 0) -> Optional[V]:
+        """Return the value stored for key if it was searched at least depth
+        deep, else None."""
+        entry = self.lookup(key)
+        if entry is None or entry.depth < depth:
+            return None
+        return entry.value
+
+    def store(self, key: int, depth: int, value: V) -> None:
+        """Store a result for key, replacing what the bucket holds as needed."""
+        index = key & self.mask
+        entry = Entry(key, depth, value, self.generation)
+        deep = self.deep[index]
+        if deep is None or depth >= deep.depth or deep.generation != self.generation:
+            # The displaced deep entry is still worth keeping over the recent one
+            if deep is not None and deep.key != key:
+                self.recent[index] = deep
+            self.deep[index] = entry
+        elif deep.key != key:
+            self.recent[index] = entry
+        # Else the same position is already stored from a deeper search, which
+        # tells the search more than this result does
+
+    def new_search(self) -> None:
+        """Start a new search: entries stored so far are the first replaced."""
+        self.generation += 1
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self.deep = [None] * len(self.deep)
+        self.recent = [None] * len(self.recent)
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,245 @@
+"""Vector environment that spreads batches of boards over worker processes.
+
+Each worker runs a :class:`batch.BatchTetris` over its own slice of the boards.
+Boards, actions and per-board results live in ``multiprocessing.shared_memory``
+blocks that the workers step in place, so the only thing sent between
+processes is a one-word command per worker per step.
+"""
+
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from batch import BatchTetris, BoolArray, IntArray
+from board import GRID_HEIGHT, GRID_WIDTH
+
+# Columns of the shared per-board state array
+PIECE, ROTATION, X, Y, NEXT_PIECE, SCORE, LINES, REWARD, DONE = range(9)
+STATE_FIELDS = 9
+
+GRID_SHAPE = (GRID_HEIGHT, GRID_WIDTH)
+
+
+def _shared_arrays(
+    grid_shm: SharedMemory, action_shm: SharedMemory, state_shm: SharedMemory, num_boards: int
+) -> Tuple[npt.NDArray[np.uint8], IntArray, IntArray]:
+    """Wrap the shared blocks in (grid, actions, state) arrays."""
+    grid: npt.NDArray[np.uint8] = np.ndarray(
+        (num_boards, *GRID_SHAPE), dtype=np.uint8, buffer=grid_shm.buf
+    )
+    actions: IntArray = np.ndarray((num_boards,), dtype=np.int64, buffer=action_shm.buf)
+    state: IntArray = np.ndarray((num_boards, STATE_FIELDS), dtype=np.int64, buffer=state_shm.buf)
+    return grid, actions, state
+
+
+def _publish(games: BatchTetris, state: IntArray) -> None:
+    """Copy the piece and score arrays the parent reads into the shared state."""
+    state[:, PIECE] = games.piece
+    state[:, ROTATION] = games.rotation
+    state[:, X] = games.x
+    state[:, Y] = games.y
+    state[:, NEXT_PIECE] = games.next_piece
+    state[:, SCORE] = games.score
+    state[:, LINES] = games.lines_cleared
+
+
+def _serve(
+    conn: Connection,
+    blocks: List[SharedMemory],
+    num_boards: int,
+    start: int,
+    stop: int,
+    seed: np.random.SeedSequence,
+    randomizer: str,
+) -> None:
+    """Step boards start:stop of the shared arrays on each command from conn."""
+    grid, actions, state = _shared_arrays(blocks[0], blocks[1], blocks[2], num_boards)
+    grid, actions, state = grid[start:stop], actions[start:stop], state[start:stop]
+    games = BatchTetris(stop - start, seed=seed, randomizer=randomizer, grid=grid)
+    _publish(games, state)
+    state[:, REWARD] = 0
+    state[:, DONE] = 0
+    conn.send("ready")
+
+    while True:
+        command = conn.recv()
+        if command == "step":
+            score = games.score.copy()
+            games.step(actions)
+            state[:, REWARD] = games.score - score
+            state[:, DONE] = games.game_over
+            # Finished games start over, so every board always has a game
+            if games.game_over.any():
+                games.reset(games.game_over)
+        elif command == "reset":
+            games.reset()
+            state[:, REWARD] = 0
+            state[:, DONE] = 0
+        elif command == "close":
+            return
+        _publish(games, state)
+        conn.send(command)
+
+
+def _worker(
+    conn: Connection,
+    names: Tuple[str, str, str],
+    num_boards: int,
+    start: int,
+    stop: int,
+    seed: np.random.SeedSequence,
+    randomizer: str,
+) -> None:
+    """Worker process entry point: attach to the shared blocks and serve."""
+    blocks = [SharedMemory(name=name) for name in names]
+    _serve(conn, blocks, num_boards, start, stop, seed, randomizer)
+    # The arrays over the blocks went with _serve's frame, so they can close
+    for block in blocks:
+        block.close()
+
+
+class VectorTetrisEnv:
+    """``num_boards`` games of Tetris stepped by ``num_workers`` processes.
+
+    ``step`` takes one action code per board (an index into
+    ``engine.ACTIONS``) and returns ``(observations, rewards, terminated,
+    truncated, info)``. Observations are a ``(num_boards, GRID_HEIGHT,
+    GRID_WIDTH)`` view over shared memory that is updated in place by every
+    step, and so are the arrays in ``info``. Games that end are restarted
+    straight away, so the observation for a terminated board is the first one
+    of its next game.
+
+    Close the environment (or use it as a context manager) to stop the workers
+    and free the shared memory.
+    """
+
+    def __init__(
+        self,
+        num_boards: int,
+        num_workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        randomizer: str = "uniform",
+    ) -> None:
+        if num_workers is None:
+            num_workers = mp.cpu_count()
+        num_workers = max(1, min(num_workers, num_boards))
+        self.num_boards = num_boards
+        self.num_workers = num_workers
+
+        self.blocks = [
+            SharedMemory(create=True, size=num_boards * GRID_HEIGHT * GRID_WIDTH),
+            SharedMemory(create=True, size=num_boards * 8),
+            SharedMemory(create=True, size=num_boards * STATE_FIELDS * 8),
+        ]
+        blocks = self.blocks
+        self.grid, self.actions, self.state = _shared_arrays(
+            blocks[0], blocks[1], blocks[2], num_boards
+        )
+        names = (blocks[0].name, blocks[1].name, blocks[2].name)
+
+        # Contiguous, near-equal slices of the boards, one per worker
+        bounds = np.linspace(0, num_boards, num_workers + 1).astype(int)
+        seeds = np.random.SeedSequence(seed).spawn(num_workers)
+        self.connections: List[Connection] = []
+        self.processes: List[mp.process.BaseProcess] = []
+        for i in range(num_workers):
+            parent, child = mp.Pipe()
+            process = mp.Process(
+                target=_worker,
+                args=(child, names, num_boards, bounds[i], bounds[i + 1], seeds[i], randomizer),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        self.closed = False
+        self._wait()
+
+    def _send(self, command: str) -> None:
+        for conn in self.connections:
+            conn.send(command)
+
+    def _wait(self) -> None:
+        for conn in self.connections:
+            conn.recv()
+
+    def info(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "piece": state[:, PIECE],
+            "rotation": state[:, ROTATION],
+            "x": state[:, X],
+            "y": state[:, Y],
+            "next_piece": state[:, NEXT_PIECE],
+            "score": state[:, SCORE],
+            "lines_cleared": state[:, LINES],
+        }
+
+    def reset(self) -> Tuple[npt.NDArray[np.uint8], Dict[str, Any]]:
+        """Start new games on every board."""
+        self._send("reset")
+        self._wait()
+        return self.grid, self.info()
+
+    def step_async(self, actions: Union[IntArray, Sequence[int]]) -> None:
+        """Hand the workers one action code per board without waiting."""
+        self.actions[:] = actions
+        self._send("step")
+
+    def step_wait(
+        self,
+    ) -> Tuple[npt.NDArray[np.uint8], IntArray, BoolArray, BoolArray, Dict[str, Any]]:
+        """Wait for the step started by step_async and return its results."""
+        self._wait()
+        terminated = self.state[:, DONE].astype(np.bool_)
+        truncated = np.zeros(self.num_boards, dtype=np.bool_)
+        return self.grid, self.state[:, REWARD].copy(), terminated, truncated, self.info()
+
+    def step(
+        self, actions: Union[IntArray, Sequence[int]]
+    ) -> Tuple[npt.NDArray[np.uint8], IntArray, BoolArray, BoolArray, Dict[str, Any]]:
+        """Apply one action code per board and return (observations, rewards,
+        terminated, truncated, info)."""
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self) -> None:
+        """Stop the workers and free the shared memory."""
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self.connections:
+            try:
+                conn.send("close")
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self.connections:
+            conn.close()
+        del self.grid, self.actions, self.state
+        for block in self.blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass  # A caller still holds an observation; the mapping outlives us
+            block.unlink()
+
+    def __enter__(self) -> "VectorTetrisEnv":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()